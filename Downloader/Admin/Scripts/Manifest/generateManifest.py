@@ -1,60 +1,288 @@
 #!/usr/bin/env python3
 # generateManifest.py
 from __future__ import annotations
-import json, os, sys, re
+import json, mmap, os, shutil, sys, re
+from operator import itemgetter
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
-# robust import of admin utilities
+try:
+    # optional: lets safe_load_first stop after the first record instead of parsing the whole file
+    import ijson
+except ImportError:
+    ijson = None
+
+try:
+    import fcntl  # POSIX only: FICLONE reflink copies in mirror_file
+except ImportError:
+    fcntl = None
+
+try:
+    # optional: faster C parser for the full-file fallback (takes bytes, no decode step)
+    import orjson
+    _loads = orjson.loads
+except ImportError:
+    orjson = None
+    _loads = json.loads
+
+# robust import of admin utilities (paths go in first so the single import attempt can succeed)
 HERE = Path(__file__).resolve().parent
 SCRIPTS = HERE.parent
 sys.path.insert(0, str(SCRIPTS / "WSDownload"))
 sys.path.insert(0, str(SCRIPTS))
 try:
     from WSDownload.adminUtils import parse_common_args, get_out_dir, log, report_progress
-except Exception:
+except ImportError:
+    def parse_common_args():
+        import argparse
+        return argparse.Namespace(out_dir=None), None
+    def get_out_dir(o):
+        return o or str(SCRIPTS / "Downloaded")
+    def log(m): print("LOG:", m)
+    def report_progress(n): print(f"PROGRESS: {n}")
+
+# only the head of a set file is needed to sample its name
+SAMPLE_BYTES = 64 * 1024
+
+# sidecar in out_dir: path -> (mtime_ns, size, entry), lets unchanged set files skip parsing
+MANIFEST_CACHE_NAME = ".manifest-cache.json"
+
+def iter_json_entries(folder: str):
+    """
+    Return sorted (name, stem, path, mtime_ns, size) tuples for the *.json files in folder.
+    One scandir pass; plain strings so callers never build Path objects per file.
+    """
     try:
-        from WSDownload.adminUtils import parse_common_args, get_out_dir, log, report_progress
-    except Exception:
-        def parse_common_args():
-            import argparse
-            return argparse.Namespace(out_dir=None), None
-        def get_out_dir(o):
-            return o or str(SCRIPTS / "Downloaded")
-        def log(m): print("LOG:", m)
-        def report_progress(n): print(f"PROGRESS: {n}")
-
-SET_KEY_RE = re.compile(r'^([A-Z0-9]{1,6})_?([A-Z0-9]{0,6})', re.IGNORECASE)
-
-def iter_json_files(folder: Path):
-    if not folder.exists():
+        out = []
+        with os.scandir(folder) as it:
+            for e in it:
+                if e.is_file() and e.name.endswith(".json"):
+                    st = e.stat()
+                    out.append((e.name, e.name[:-5], e.path, st.st_mtime_ns, st.st_size))
+        # sort on the plain name strings only (C-level str compare, no tuple/Path comparisons)
+        out.sort(key=itemgetter(0))
+        return out
+    except (FileNotFoundError, NotADirectoryError):
         return []
-    return sorted(folder.glob("*.json"))
 
-def safe_load_first(fpath: Path):
+def prefetch_samples(entries, nbytes: int = SAMPLE_BYTES) -> None:
+    """
+    Queue kernel readahead for the head of every set file before parsing starts,
+    so the block layer sees all reads at once instead of one per worker round-trip.
+    Best-effort: no-op where posix_fadvise is unavailable (non-Linux).
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for entry in entries:
+        path = entry[2]
+        try:
+            fd = os.open(path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, nbytes, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+def _first_record(v):
+    if isinstance(v, list) and v:
+        return v[0]
+    if isinstance(v, dict):
+        return v
+    return None
+
+def _first_from_data(data):
+    if isinstance(data, list) and data:
+        return data[0]
+    if isinstance(data, dict):
+        for v in data.values():
+            return _first_record(v)
+    return None
+
+_WS_RE = re.compile(rb"[ \t\r\n]*")
+_STR_RE = re.compile(rb'"(?:[^"\\]|\\.)*"')
+_TOKEN_RE = re.compile(rb'"(?:[^"\\]|\\.)*"|[{}\[\]]')
+
+def _object_end(buf, start: int, limit: int) -> int:
+    """Index just past the {...} / [...] opening at buf[start] (strings skipped), or -1 if buf[:limit] ends first."""
+    depth = 0
+    for m in _TOKEN_RE.finditer(buf, start, limit):
+        c = buf[m.start()]
+        if c == 0x22:    # "
+            continue
+        if c in (0x7B, 0x5B):    # { [
+            depth += 1
+        else:
+            depth -= 1
+            if depth == 0:
+                return m.end()
+    return -1
+
+# the only fields make_set_entry reads from a sample, in priority order
+NAME_KEYS = ("expansion", "name", "set_name", "series")
+_NAME_KEYS_B = frozenset(k.encode() for k in NAME_KEYS)
+_KEY_RE = re.compile(rb'[ \t\r\n]*"((?:[^"\\]|\\.)*)"[ \t\r\n]*:[ \t\r\n]*')
+_SCALAR_RE = re.compile(rb'[^,}\] \t\r\n]+')
+
+def _scan_name_fields(buf, start: int, end: int):
+    """
+    Pull the NAME_KEYS string values out of the object buf[start:end] without parsing it:
+    walk its top-level keys, skip nested values by bracket matching, and slice the wanted
+    strings directly. Returns None on anything unusual (escapes, non-string names, odd syntax)
+    so the caller parses the object properly instead.
+    """
+    found = {}
+    pos = start + 1
+    after_comma = False
+    while True:
+        m = _KEY_RE.match(buf, pos, end)
+        if not m:
+            # empty object is fine; a "}" right after "," is a trailing comma (invalid JSON)
+            if after_comma:
+                return None
+            return found if buf[_WS_RE.match(buf, pos, end).end()] == 0x7D else None
+        key = m.group(1)
+        pos = m.end()
+        c = buf[pos]
+        if c == 0x22:    # string value
+            v = _STR_RE.match(buf, pos, end)
+            if not v:
+                return None
+            if key in _NAME_KEYS_B:
+                raw = buf[pos + 1:v.end() - 1]
+                if b"\\" in raw:
+                    return None
+                found[key.decode()] = raw.decode("utf-8")
+            pos = v.end()
+        elif c in (0x7B, 0x5B):    # nested object / array
+            if key in _NAME_KEYS_B:
+                return None
+            pos = _object_end(buf, pos, end)
+            if pos < 0:
+                return None
+        else:    # number / true / false / null
+            if key in _NAME_KEYS_B:
+                return None
+            v = _SCALAR_RE.match(buf, pos, end)
+            if not v:
+                return None
+            pos = v.end()
+        pos = _WS_RE.match(buf, pos, end).end()
+        if pos >= end:
+            return None
+        if buf[pos] == 0x7D:    # }
+            return found
+        if buf[pos] != 0x2C:    # ,
+            return None
+        pos += 1
+        after_comma = True
+
+def _sample_from_head(buf, limit: int):
+    """
+    Parse only the first record out of the first `limit` bytes of buf (bytes or mmap):
+    the first object of a top-level list, or the first value (or its first item)
+    of a top-level dict. Usually only its NAME_KEYS fields, via _scan_name_fields.
+    Returns None when that record is not complete inside the head.
+    """
+    n = min(len(buf), limit)
+    i = _WS_RE.match(buf, 0, n).end()
+    if i >= n:
+        return None
+    if buf[i] == 0x7B:    # {"key": {...}} or {"key": [{...}]}
+        i = _WS_RE.match(buf, i + 1, n).end()
+        m = _STR_RE.match(buf, i, n)
+        if not m:
+            return None
+        i = _WS_RE.match(buf, m.end(), n).end()
+        if i >= n or buf[i] != 0x3A:    # :
+            return None
+        i = _WS_RE.match(buf, i + 1, n).end()
+    if i < n and buf[i] == 0x5B:    # [
+        i = _WS_RE.match(buf, i + 1, n).end()
+    if i >= n or buf[i] != 0x7B:
+        return None
+    end = _object_end(buf, i, n)
+    if end < 0:
+        return None
+    found = _scan_name_fields(buf, i, end)
+    if found is not None:
+        return found
     try:
-        data = json.loads(fpath.read_text(encoding="utf-8"))
-        if isinstance(data, list) and data:
-            return data[0]
-        if isinstance(data, dict):
-            vals = list(data.values())
-            if vals:
-                v0 = vals[0]
-                if isinstance(v0, list) and v0:
-                    return v0[0]
-                if isinstance(v0, dict):
-                    return v0
+        return _loads(buf[i:end])
+    except Exception:
+        return None
+
+def _build_streamed_value(first, events):
+    """Assemble the value that starts with event `first` from the remaining parse events."""
+    builder = ijson.ObjectBuilder()
+    builder.event(*first)
+    if first[0] not in ("start_map", "start_array"):
+        return builder.value
+    depth = 1
+    for _, ev, val in events:
+        builder.event(ev, val)
+        if ev in ("start_map", "start_array"):
+            depth += 1
+        elif ev in ("end_map", "end_array"):
+            depth -= 1
+            if depth == 0:
+                return builder.value
+    raise ValueError("truncated JSON value")
+
+def _stream_first_record(events):
+    """
+    _first_from_data for a top-level object, from ijson.parse events: only the first
+    key's first record is built (the first item of a list value, or a map value itself),
+    the rest of the file is never read into memory.
+    """
+    events = iter(events)
+    if next(events, (None, None, None))[1] != "start_map":
+        return None
+    _, ev, _ = next(events, (None, None, None))
+    if ev != "map_key":
+        return None
+    _, ev, val = next(events)
+    if ev == "start_array":
+        _, ev, val = next(events)
+        if ev == "end_array":
+            return None
+        return _build_streamed_value((ev, val), events)
+    if ev == "start_map":
+        return _build_streamed_value((ev, val), events)
+    return None
+
+def safe_load_first(path: str, fname: str):
+    try:
+        with open(path, "rb") as f:
+            if os.fstat(f.fileno()).st_size < SAMPLE_BYTES:
+                # small file: one read, then try the first record before parsing it all
+                data = f.read()
+                sample = _sample_from_head(data, len(data))
+                return sample if sample is not None else _first_from_data(_loads(data))
+            # large file: map it and scan only the head, so just those pages get faulted in
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                sample = _sample_from_head(mm, SAMPLE_BYTES)
+                if sample is not None:
+                    return sample
+                top = mm[:64].lstrip()
+            if ijson is None:
+                return _first_from_data(_loads(f.read()))
+            # peek the top-level container type, then stream only the first element
+            if top.startswith(b"["):
+                return next(ijson.items(f, "item"), None)
+            if top.startswith(b"{"):
+                return _stream_first_record(ijson.parse(f))
         return None
     except Exception as e:
-        log(f"failed to load {fpath.name}: {e}")
+        log(f"failed to load {fname}: {e}")
         return None
 
-def make_set_entry(fpath: Path, lang: str):
-    fname = fpath.name
-    key = fpath.stem
+def make_set_entry(entry, lang: str):
+    fname, key, path = entry[:3]
     name = None
-    sample = safe_load_first(fpath)
+    sample = safe_load_first(path, fname)
     if sample and isinstance(sample, dict):
-        name = sample.get("expansion") or sample.get("name") or sample.get("set_name") or sample.get("series")
+        name = next((sample[k] for k in NAME_KEYS if sample.get(k)), None)
     return {
         "key": key,
         "name": name or key,
@@ -62,12 +290,75 @@ def make_set_entry(fpath: Path, lang: str):
         "lang": lang
     }
 
+def _dumps(obj, minify=False) -> bytes:
+    # UTF-8 bytes straight from the serializer, no str -> bytes re-encode
+    if orjson is not None:
+        return orjson.dumps(obj) if minify else orjson.dumps(obj, option=orjson.OPT_INDENT_2)
+    if minify:
+        return json.dumps(obj, separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
+
+def load_manifest_cache(path: Path) -> dict:
+    try:
+        data = _loads(path.read_bytes())
+        return data if isinstance(data, dict) else {}
+    except Exception:
+        return {}
+
+def cached_set_entry(cache: dict, entry, lang: str):
+    """The cached manifest entry for entry if the file is unchanged (same mtime and size), else None."""
+    hit = cache.get(entry[2])
+    if (isinstance(hit, dict) and hit.get("mtime_ns") == entry[3] and hit.get("size") == entry[4]
+            and isinstance(hit.get("entry"), dict) and hit["entry"].get("lang") == lang):
+        return hit["entry"]
+    return None
+
 def write_json(path: Path, obj, minify=False):
+    # temp + rename: readers never see a partial file, and hard-linked mirrors keep the old inode
     path.parent.mkdir(parents=True, exist_ok=True)
-    if minify:
-        path.write_text(json.dumps(obj, separators=(",", ":")), encoding="utf-8")
-    else:
-        path.write_text(json.dumps(obj, indent=2, ensure_ascii=False), encoding="utf-8")
+    tmp = path.with_name(f".{path.name}.tmp")
+    tmp.write_bytes(_dumps(obj, minify))
+    os.replace(tmp, path)
+
+def write_json_list(path: Path, items) -> list:
+    """
+    Stream an iterable of dicts to path as a JSON list, one entry at a time, in the same
+    layout as write_json(minify=False). Returns the entries that were written.
+    """
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.tmp")
+    written = []
+    with open(tmp, "wb") as f:
+        for item in items:
+            # re-indent the entry one level; raw newlines only occur between tokens
+            f.write((b",\n  " if written else b"[\n  ") + _dumps(item).replace(b"\n", b"\n  "))
+            written.append(item)
+        f.write(b"\n]" if written else b"[]")
+    os.replace(tmp, path)
+    return written
+
+FICLONE = 0x40049409  # linux/fs.h: share the source extents (btrfs, xfs reflink), no data written
+
+def mirror_file(src: Path, dst: Path):
+    """
+    Put an independent, byte-identical copy of src at dst (reflink when the filesystem
+    supports it, plain copy otherwise), swapped in with os.replace. Not a hard link:
+    the two manifests must not share an inode, or an in-place write to one would
+    silently change the other.
+    """
+    dst.parent.mkdir(parents=True, exist_ok=True)
+    tmp = dst.with_name(f".{dst.name}.tmp")
+    cloned = False
+    if fcntl is not None:
+        try:
+            with open(src, "rb") as fsrc, open(tmp, "wb") as fdst:
+                fcntl.ioctl(fdst.fileno(), FICLONE, fsrc.fileno())
+            cloned = True
+        except OSError:
+            pass
+    if not cloned:
+        shutil.copyfile(src, tmp)
+    os.replace(tmp, dst)
 
 def main():
     ns, _ = parse_common_args()
@@ -77,40 +368,70 @@ def main():
     out_dir.mkdir(parents=True, exist_ok=True)
 
     # determine downloads root: prefer explicit env DOWNLOADS_ROOT (e.g. /data), else fallback to out_dir parent
-    downloads_root = Path(os.environ.get("DOWNLOADS_ROOT") or out_dir)
-    downloads_root = downloads_root.expanduser().resolve()
+    # (plain str paths from here on; Path only where a write needs parent.mkdir)
+    downloads_root = os.path.realpath(os.path.expanduser(os.environ.get("DOWNLOADS_ROOT") or str(out_dir)))
 
     # JSON directories inside the mounted DB folders
-    eng_json_dir = downloads_root / "DB-ENG" / "Json"
-    jp_json_dir  = downloads_root / "DB-JP"  / "Json"
+    eng_json_dir = os.path.join(downloads_root, "DB-ENG", "Json")
+    jp_json_dir  = os.path.join(downloads_root, "DB-JP", "Json")
 
     total_steps = 3
     step = 0
 
-    eng_files = list(iter_json_files(eng_json_dir))
+    eng_files = iter_json_entries(eng_json_dir)
     log(f"Found {len(eng_files)} ENG sets in {eng_json_dir}")
     step += 1
     report_progress(int(step/total_steps*100))
 
-    jp_files = list(iter_json_files(jp_json_dir))
+    jp_files = iter_json_entries(jp_json_dir)
     log(f"Found {len(jp_files)} JP sets in {jp_json_dir}")
     step += 1
     report_progress(int(step/total_steps*100))
 
-    eng_sets = [make_set_entry(p, "EN") for p in eng_files]
-    jp_sets  = [make_set_entry(p, "JP") for p in jp_files]
+    # unchanged files (same mtime + size as last run) reuse their cached entry
+    cache_path = out_dir / MANIFEST_CACHE_NAME
+    cache = load_manifest_cache(cache_path)
+
+    def set_entry(e, lang):
+        hit = cached_set_entry(cache, e, lang)
+        return hit if hit is not None else make_set_entry(e, lang)
+
+    misses = [e for e in eng_files if cached_set_entry(cache, e, "EN") is None]
+    misses += [e for e in jp_files if cached_set_entry(cache, e, "JP") is None]
+    log(f"{len(eng_files) + len(jp_files) - len(misses)} sets unchanged since last run, parsing {len(misses)}")
+    prefetch_samples(misses)
 
     # Write language manifests into the script's out_dir (for historical compatibility)
-    write_json(out_dir / "manifest-eng.json", eng_sets, minify=False)
-    write_json(out_dir / "manifest-jp.json", jp_sets, minify=False)
+    eng_manifest_path = out_dir / "manifest-eng.json"
+    jp_manifest_path  = out_dir / "manifest-jp.json"
+
+    # each entry is an independent small file read+parse: fan out over a thread pool
+    # (ENG and JP share the pool so they overlap; map() keeps the manifest order stable)
+    # and stream entries into the manifest as they come back instead of serializing the whole list
+    with ThreadPoolExecutor(max_workers=min(32, (os.cpu_count() or 1) * 4)) as ex:
+        eng_futs = ex.map(lambda e: set_entry(e, "EN"), eng_files)
+        jp_futs  = ex.map(lambda e: set_entry(e, "JP"), jp_files)
+        eng_sets = write_json_list(eng_manifest_path, eng_futs)
+        jp_sets  = write_json_list(jp_manifest_path, jp_futs)
+
+    # persist the cache for the current file set only (drops deleted files)
+    try:
+        fresh = {}
+        for files, sets in ((eng_files, eng_sets), (jp_files, jp_sets)):
+            for e, entry in zip(files, sets):
+                fresh[e[2]] = {"mtime_ns": e[3], "size": e[4], "entry": entry}
+        write_json(cache_path, fresh, minify=True)
+    except Exception as e:
+        log(f"failed to write manifest cache: {e}")
 
-    # Also write a compact sets-manifest.json into the mounted DB folders so front-end expects it at /data/DB-**/sets-manifest.json
+    # Also place the same bytes as sets-manifest.json into the mounted DB folders so front-end expects it at /data/DB-**/sets-manifest.json
+    # (linked/copied from the file above instead of serializing everything a second time)
     try:
-        eng_sets_manifest_path = downloads_root / "DB-ENG" / "sets-manifest.json"
-        jp_sets_manifest_path  = downloads_root / "DB-JP"  / "sets-manifest.json"
+        eng_sets_manifest_path = Path(downloads_root, "DB-ENG", "sets-manifest.json")
+        jp_sets_manifest_path  = Path(downloads_root, "DB-JP", "sets-manifest.json")
 
-        write_json(eng_sets_manifest_path, eng_sets, minify=False)
-        write_json(jp_sets_manifest_path, jp_sets, minify=False)
+        mirror_file(eng_manifest_path, eng_sets_manifest_path)
+        mirror_file(jp_manifest_path, jp_sets_manifest_path)
         log(f"Wrote {len(eng_sets)} ENG entries and {len(jp_sets)} JP entries to {eng_sets_manifest_path} and {jp_sets_manifest_path}")
     except Exception as e:
         log(f"failed to write sets-manifest into downloads root: {e}")
@@ -1,12 +1,35 @@
 # adminUtils.py
 # helper shim used by admin scripts and to satisfy static analysis
 import argparse
+import atexit
+import copy
 from pathlib import Path
 import os
+import queue
+import signal
 import sys
 import json
-from datetime import datetime
-from typing import Optional, Dict, Any
+import math
+import threading
+import time
+from typing import Optional, Dict, Any, Tuple
+
+try:
+    # optional: faster (de)serialization of status.json; stdlib json is the fallback
+    import orjson
+except ImportError:
+    orjson = None
+
+def _json_loads(raw: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def _json_dumps_pretty(obj: Any) -> bytes:
+    """Indented UTF-8 JSON bytes (same layout as json.dumps(indent=2, ensure_ascii=False))."""
+    if orjson is not None:
+        return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+    return json.dumps(obj, indent=2, ensure_ascii=False).encode("utf-8")
 
 def parse_common_args():
     ap = argparse.ArgumentParser(add_help=False)
@@ -39,9 +62,18 @@ def get_out_dir(o: Optional[str]) -> str:
         return str(Path(o).expanduser().resolve())
     return str(_repo_downloader_root())
 
+# stdout is parsed line by line by the Node server; worker threads and the concurrent
+# fetch stages all log, so every record goes out as one pre-formatted write under this lock
+_OUT_LOCK = threading.Lock()
+
+def _emit(line: str) -> None:
+    with _OUT_LOCK:
+        sys.stdout.write(line + "\n")
+        sys.stdout.flush()
+
 def log(msg: str) -> None:
-    # use flush=True to avoid stdout buffering delays
-    print("LOG:", msg, flush=True)
+    # flush after each line to avoid stdout buffering delays
+    _emit(f"LOG: {msg}")
 
 def report_progress(n: int) -> None:
     """
@@ -54,10 +86,156 @@ def report_progress(n: int) -> None:
     except Exception:
         pct = 0
     # ensure immediate flush so Node can parse it
-    print(f"PROGRESS: {pct}", flush=True)
+    _emit(f"PROGRESS: {pct}")
 
 # --- Extended status writer ---
 # Writes an atomic status.json with structure described in your spec.
+# The merged state is kept in memory: status.json is read once (first write) and
+# every later call only mutates the cache and serializes it, instead of parsing the file again.
+# Updates are queued and written by a single daemon thread at most every
+# _STATUS_INTERVAL seconds, so bursts of progress/log updates coalesce into one write.
+_STATUS_CACHE: Dict[str, Any] = {}
+_STATUS_LOADED = False
+_STATUS_LOCK = threading.Lock()
+_STATUS_QUEUE: "queue.Queue[Dict[str, Any]]" = queue.Queue()
+_STATUS_WAKE = threading.Event()
+_STATUS_INTERVAL = 0.1
+_STATUS_THREAD: Optional[threading.Thread] = None
+# True until one full merge has normalized the cached structure; after that, updates that
+# only carry lastLog/state/jobId/low percent skip the totals recompute (see _apply_status_update)
+_STATUS_NEEDS_FULL = True
+
+# (status.json, temp file) as plain str paths, resolved once on first use
+_STATUS_PATHS: Optional[Tuple[str, str]] = None
+
+# [epoch second, formatted UTC string]: status writes within the same second share one string
+_TS_CACHE = [0, ""]
+
+def _status_timestamp() -> str:
+    now = int(time.time())
+    if now != _TS_CACHE[0]:
+        _TS_CACHE[:] = [now, time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(now))]
+    return _TS_CACHE[1]
+
+def _status_paths() -> Tuple[str, str]:
+    global _STATUS_PATHS
+    if _STATUS_PATHS is None:
+        out_dir = Path(get_out_dir(None))
+        out_dir.mkdir(parents=True, exist_ok=True)
+        _STATUS_PATHS = (str(out_dir / "status.json"), str(out_dir / ".status.json.tmp"))
+    return _STATUS_PATHS
+
+def _load_status_cache(status_path: str) -> Dict[str, Any]:
+    """Seed the in-memory status from disk on first use (caller holds _STATUS_LOCK)."""
+    global _STATUS_LOADED
+    if not _STATUS_LOADED:
+        _STATUS_LOADED = True
+        try:
+            with open(status_path, "rb") as f:
+                data = _json_loads(f.read())
+            if isinstance(data, dict):
+                _STATUS_CACHE.update(data)
+        except Exception:
+            pass
+    return _STATUS_CACHE
+
+def _write_status_atomic(data: Dict[str, Any], status_path: str, tmp: str) -> None:
+    # raw fd write of the serialized bytes + rename; no fsync (status.json is advisory)
+    payload = memoryview(_json_dumps_pretty(data))
+    fd = os.open(tmp, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o644)
+    try:
+        while payload:
+            payload = payload[os.write(fd, payload):]
+    finally:
+        os.close(fd)
+    os.replace(tmp, status_path)
+
+def _drain_status_queue() -> None:
+    """Apply every queued update, then write once (caller holds _STATUS_LOCK)."""
+    pending = []
+    while True:
+        try:
+            pending.append(_STATUS_QUEUE.get_nowait())
+        except queue.Empty:
+            break
+    if not pending:
+        return
+    status_path, tmp = _status_paths()
+    data = _load_status_cache(status_path)
+    for upd in pending:
+        try:
+            _apply_status_update(data, **upd)
+        except Exception:
+            pass
+    _write_status_atomic(data, status_path, tmp)
+
+def _status_writer_loop() -> None:
+    while True:
+        _STATUS_WAKE.wait()
+        # let a burst of updates pile up before touching the disk
+        time.sleep(_STATUS_INTERVAL)
+        _STATUS_WAKE.clear()
+        try:
+            with _STATUS_LOCK:
+                _drain_status_queue()
+        except Exception:
+            pass
+
+def _ensure_status_writer() -> None:
+    global _STATUS_THREAD
+    if _STATUS_THREAD is None:
+        with _STATUS_LOCK:
+            if _STATUS_THREAD is None:
+                _STATUS_THREAD = threading.Thread(target=_status_writer_loop, name="status-writer", daemon=True)
+                _STATUS_THREAD.start()
+
+def flush_status() -> None:
+    """
+    Synchronously write any queued status updates to status.json.
+    Registered with atexit; call explicitly when the UI must see a state change right away.
+    """
+    try:
+        with _STATUS_LOCK:
+            _drain_status_queue()
+    except Exception:
+        return
+
+def read_status() -> Dict[str, Any]:
+    """Return a copy of the current status (queued updates applied), without re-reading the file."""
+    try:
+        with _STATUS_LOCK:
+            _drain_status_queue()
+            status_path, _ = _status_paths()
+            return copy.deepcopy(_load_status_cache(status_path))
+    except Exception:
+        return {}
+
+atexit.register(flush_status)
+
+def _flush_status_on_sigterm(signum, frame) -> None:
+    """
+    Cancel from the Admin server is a SIGTERM, and atexit does not run on signals: write
+    the queued status first, then die of the signal as before. The lock wait is bounded,
+    since the interrupted main thread may itself hold it mid-update.
+    """
+    try:
+        if _STATUS_LOCK.acquire(timeout=2):
+            try:
+                _drain_status_queue()
+            finally:
+                _STATUS_LOCK.release()
+    except Exception:
+        pass
+    signal.signal(signum, signal.SIG_DFL)
+    os.kill(os.getpid(), signum)
+
+# signal handlers can only be installed from the main thread; leave any handler the host set
+if threading.current_thread() is threading.main_thread() and signal.getsignal(signal.SIGTERM) is signal.SIG_DFL:
+    try:
+        signal.signal(signal.SIGTERM, _flush_status_on_sigterm)
+    except (ValueError, OSError):
+        pass
+
 def write_status_file(
     percent: Optional[int] = None,
     last_log: Optional[str] = None,
@@ -67,160 +245,181 @@ def write_status_file(
     percent_details: Optional[Dict[str, Any]] = None
 ) -> None:
     """
-    Atomically write (or update) status.json in the repo Downloader folder only.
+    Queue an update of status.json in the repo Downloader folder only (written atomically
+    by the background writer; call flush_status() to force it out).
     - Does NOT create a top-level 'percent' key.
-    - Merges provided data with existing file so keys are preserved.
+    - Merges provided data with the existing status (read from disk once, then cached) so keys are preserved.
     - Ensures percent_details and totalfiles keys exist and are numeric.
     - If a language run reaches 100% currentpercent, set that language's missing to 0 and update totalpercentXX.
     """
     try:
-        out_dir = Path(get_out_dir(None))
-        out_dir.mkdir(parents=True, exist_ok=True)
-        status_path = out_dir / "status.json"
-        tmp = out_dir / ".status.json.tmp"
+        # non-blocking: the writer thread merges and writes (see _drain_status_queue)
+        _STATUS_QUEUE.put({
+            "percent": percent,
+            "last_log": last_log,
+            "state": state,
+            "job_id": job_id,
+            "totalfiles": dict(totalfiles) if totalfiles else None,
+            "percent_details": dict(percent_details) if percent_details else None,
+        })
+        _ensure_status_writer()
+        _STATUS_WAKE.set()
+    except Exception:
+        # best-effort: do not raise from status writer
+        return
 
-        # load existing content if present
-        data: Dict[str, Any] = {}
-        if status_path.exists():
-            try:
-                data = json.loads(status_path.read_text(encoding="utf-8"))
-            except Exception:
-                data = {}
+_TOTALFILES_DEFAULTS: Dict[str, int] = {"engtotal": 0, "jptotal": 0, "engmissing": 0, "jpmissing": 0}
+_PERCENT_DEFAULTS: Dict[str, float] = {
+    "totalpercent": 0.0,
+    "totalpercenteng": 0.0,
+    "totalpercentjp": 0.0,
+    "currentpercent": 0.0,
+    "currentpercenteng": 0.0,
+    "currentpercentjp": 0.0
+}
 
-        # ensure structure for totalfiles
-        tf = dict(data.get("totalfiles", {"engtotal": 0, "jptotal": 0, "engmissing": 0, "jpmissing": 0}))
-        for k in ("engtotal", "jptotal", "engmissing", "jpmissing"):
-            try:
-                tf[k] = int(tf.get(k, 0) or 0)
-            except Exception:
-                tf[k] = 0
-
-        # ensure structure for percent_details
-        pd = dict(data.get("percent_details", {
-            "totalpercent": 0.0,
-            "totalpercenteng": 0.0,
-            "totalpercentjp": 0.0,
-            "currentpercent": 0.0,
-            "currentpercenteng": 0.0,
-            "currentpercentjp": 0.0
-        }))
-        for k in ("totalpercent", "totalpercenteng", "totalpercentjp", "currentpercent", "currentpercenteng", "currentpercentjp"):
-            try:
-                pd[k] = float(pd.get(k, 0.0) or 0.0)
-            except Exception:
-                pd[k] = 0.0
-
-        # merge incoming totalfiles
-        if totalfiles:
-            for k in ("engtotal", "jptotal", "engmissing", "jpmissing"):
-                if k in totalfiles:
-                    try:
-                        tf[k] = int(totalfiles[k])
-                    except Exception:
-                        tf[k] = 0
-
-        # merge incoming percent_details
-        if percent_details:
-            for k in ("totalpercent", "totalpercenteng", "totalpercentjp", "currentpercent", "currentpercenteng", "currentpercentjp"):
-                if k in percent_details:
-                    try:
-                        pd[k] = float(percent_details[k])
-                    except Exception:
-                        pd[k] = 0.0
-
-        # legacy percent argument: map to currentpercent (do not write top-level percent)
+def _safe_int(x: Any, default: int = 0) -> int:
+    # type checks instead of try/except: this runs for every key on every status update
+    if type(x) is int:
+        return x
+    if type(x) is float and math.isfinite(x):
+        return int(x)
+    return default
+
+def _safe_float(x: Any, default: float = 0.0) -> float:
+    if type(x) is float or type(x) is int:
+        return float(x)
+    return default
+
+def _merge_status_meta(data: Dict[str, Any], last_log: Optional[str], state: Optional[str], job_id: Optional[str]) -> None:
+    if last_log is not None:
+        data["lastLog"] = str(last_log)
+    if state is not None:
+        data["state"] = str(state)
+    if job_id is not None:
+        data["jobId"] = str(job_id)
+
+def _apply_status_update(
+    data: Dict[str, Any],
+    percent: Optional[int],
+    last_log: Optional[str],
+    state: Optional[str],
+    job_id: Optional[str],
+    totalfiles: Optional[Dict[str, int]],
+    percent_details: Optional[Dict[str, Any]]
+) -> None:
+    """Merge one update into the cached status dict in place (caller holds _STATUS_LOCK)."""
+    global _STATUS_NEEDS_FULL
+    if (not _STATUS_NEEDS_FULL and totalfiles is None and percent_details is None
+            and (percent is None or _safe_int(percent) < 99)):
+        # fast path: totals are unchanged and nothing can hit the "run finished" rules,
+        # so the recompute below would reproduce the same numbers
         if percent is not None:
-            try:
-                pct = int(percent)
-            except Exception:
-                pct = 0
-            pd["currentpercent"] = float(pct)
-
-        # last_log / state / job_id merge
-        if last_log is not None:
-            data["lastLog"] = str(last_log)
-        if state is not None:
-            data["state"] = str(state)
-        if job_id is not None:
-            data["jobId"] = str(job_id)
-
-        # -----------------------
-        # Recompute language-specific and overall percentages
-        # -----------------------
-        try:
-            engtotal = int(tf.get("engtotal", 0) or 0)
-            engmissing = int(tf.get("engmissing", 0) or 0)
-            jptotal = int(tf.get("jptotal", 0) or 0)
-            jpmissing = int(tf.get("jpmissing", 0) or 0)
+            data["percent_details"]["currentpercent"] = float(_safe_int(percent))
+        _merge_status_meta(data, last_log, state, job_id)
+        data["timestamp"] = _status_timestamp()
+        return
 
-            eng_completed = max(0, engtotal - engmissing)
-            jp_completed = max(0, jptotal - jpmissing)
+    # ensure structure for totalfiles / percent_details (extra keys are preserved)
+    old_tf = data.get("totalfiles")
+    old_tf = old_tf if isinstance(old_tf, dict) else {}
+    tf = dict(old_tf)
+    tf.update({k: _safe_int(old_tf.get(k), v) for k, v in _TOTALFILES_DEFAULTS.items()})
 
-            # totalpercenteng = fraction of ENG images that are present/completed
-            if engtotal > 0:
-                pd["totalpercenteng"] = float((eng_completed / engtotal) * 100.0)
-            else:
-                pd["totalpercenteng"] = 0.0
+    old_pd = data.get("percent_details")
+    old_pd = old_pd if isinstance(old_pd, dict) else {}
+    pd = dict(old_pd)
+    pd.update({k: _safe_float(old_pd.get(k), v) for k, v in _PERCENT_DEFAULTS.items()})
 
-            # totalpercentjp = fraction of JP images that are present/completed
-            if jptotal > 0:
-                pd["totalpercentjp"] = float((jp_completed / jptotal) * 100.0)
-            else:
-                pd["totalpercentjp"] = 0.0
-
-            # overall totalpercent is based on combined totals (ENG + JP)
-            overall_total = engtotal + jptotal
-            if overall_total > 0:
-                pd["totalpercent"] = float(((eng_completed + jp_completed) / overall_total) * 100.0)
-            else:
-                pd["totalpercent"] = float(pd.get("totalpercent", 0.0))
-        except Exception:
-            # keep prior values if something goes wrong
-            pass
+    # merge incoming totalfiles / percent_details (non-numeric values become 0)
+    if totalfiles:
+        tf.update({k: _safe_int(totalfiles[k]) for k in _TOTALFILES_DEFAULTS if k in totalfiles})
+    if percent_details:
+        pd.update({k: _safe_float(percent_details[k]) for k in _PERCENT_DEFAULTS if k in percent_details})
 
-        # If a language run completed (currentpercentXX >= 100), clear its missing & mark totals
-        try:
-            # ENG run finished
-            if pd.get("currentpercenteng", 0.0) >= 99.999:
-                if engtotal > 0:
-                    tf["engmissing"] = 0
-                    pd["totalpercenteng"] = 100.0
-                # reset transient current percent for ENG to 0 (done)
-                pd["currentpercenteng"] = 0.0
-
-            # JP run finished
-            if pd.get("currentpercentjp", 0.0) >= 99.999:
-                if jptotal > 0:
-                    tf["jpmissing"] = 0
-                    pd["totalpercentjp"] = 100.0
-                pd["currentpercentjp"] = 0.0
-
-            # BOTH job finished (if caller set generic currentpercent >=100) — set both languages to complete if totals exist
-            if pd.get("currentpercent", 0.0) >= 99.999:
-                if engtotal > 0:
-                    tf["engmissing"] = 0
-                    pd["totalpercenteng"] = 100.0
-                if jptotal > 0:
-                    tf["jpmissing"] = 0
-                    pd["totalpercentjp"] = 100.0
-                pd["currentpercent"] = 0.0
-                pd["currentpercenteng"] = 0.0
-                pd["currentpercentjp"] = 0.0
-                pd["totalpercent"] = 100.0 if (engtotal + jptotal) > 0 else pd.get("totalpercent", 0.0)
-        except Exception:
-            pass
+    # legacy percent argument: map to currentpercent (do not write top-level percent)
+    if percent is not None:
+        pd["currentpercent"] = float(_safe_int(percent))
+
+    # last_log / state / job_id merge
+    _merge_status_meta(data, last_log, state, job_id)
+
+    # -----------------------
+    # Recompute language-specific and overall percentages
+    # -----------------------
+    try:
+        engtotal = tf["engtotal"]
+        engmissing = tf["engmissing"]
+        jptotal = tf["jptotal"]
+        jpmissing = tf["jpmissing"]
 
-        # write merged structure back (do NOT write a top-level 'percent' key)
-        data["totalfiles"] = tf
-        data["percent_details"] = pd
-        data["timestamp"] = datetime.utcnow().isoformat() + "Z"
+        eng_completed = max(0, engtotal - engmissing)
+        jp_completed = max(0, jptotal - jpmissing)
 
-        # atomic write
-        tmp.write_text(json.dumps(data, indent=2, ensure_ascii=False), encoding="utf-8")
-        tmp.replace(status_path)
+        # totalpercenteng = fraction of ENG images that are present/completed
+        if engtotal > 0:
+            pd["totalpercenteng"] = float((eng_completed / engtotal) * 100.0)
+        else:
+            pd["totalpercenteng"] = 0.0
+
+        # totalpercentjp = fraction of JP images that are present/completed
+        if jptotal > 0:
+            pd["totalpercentjp"] = float((jp_completed / jptotal) * 100.0)
+        else:
+            pd["totalpercentjp"] = 0.0
+
+        # overall totalpercent is based on combined totals (ENG + JP)
+        overall_total = engtotal + jptotal
+        if overall_total > 0:
+            pd["totalpercent"] = float(((eng_completed + jp_completed) / overall_total) * 100.0)
+        else:
+            pd["totalpercent"] = float(pd.get("totalpercent", 0.0))
     except Exception:
-        # best-effort: do not raise from status writer
-        return
+        # keep prior values if something goes wrong
+        pass
+
+    # If a language run completed (currentpercentXX >= 100), clear its missing & mark totals
+    # (this changes totals after they were used above, so the next update must recompute again)
+    finished = False
+    try:
+        # ENG run finished
+        if pd.get("currentpercenteng", 0.0) >= 99.999:
+            finished = True
+            if engtotal > 0:
+                tf["engmissing"] = 0
+                pd["totalpercenteng"] = 100.0
+            # reset transient current percent for ENG to 0 (done)
+            pd["currentpercenteng"] = 0.0
+
+        # JP run finished
+        if pd.get("currentpercentjp", 0.0) >= 99.999:
+            finished = True
+            if jptotal > 0:
+                tf["jpmissing"] = 0
+                pd["totalpercentjp"] = 100.0
+            pd["currentpercentjp"] = 0.0
+
+        # BOTH job finished (if caller set generic currentpercent >=100) — set both languages to complete if totals exist
+        if pd.get("currentpercent", 0.0) >= 99.999:
+            finished = True
+            if engtotal > 0:
+                tf["engmissing"] = 0
+                pd["totalpercenteng"] = 100.0
+            if jptotal > 0:
+                tf["jpmissing"] = 0
+                pd["totalpercentjp"] = 100.0
+            pd["currentpercent"] = 0.0
+            pd["currentpercenteng"] = 0.0
+            pd["currentpercentjp"] = 0.0
+            pd["totalpercent"] = 100.0 if (engtotal + jptotal) > 0 else pd.get("totalpercent", 0.0)
+    except Exception:
+        pass
+
+    # write merged structure back (do NOT write a top-level 'percent' key)
+    data["totalfiles"] = tf
+    data["percent_details"] = pd
+    data["timestamp"] = _status_timestamp()
+    _STATUS_NEEDS_FULL = finished
 
 def print_result(msg: str, color: str = "", end: str = "\n") -> None:
     # original behaviour: log friendly message to stdout (flush to avoid buffering)
@@ -233,7 +432,7 @@ def print_result(msg: str, color: str = "", end: str = "\n") -> None:
 
 def fatal(msg: str, code: int = 1):
     # ensure immediate reporting and status write
-    print("FATAL:", msg, flush=True)
+    _emit(f"FATAL: {msg}")
     try:
         write_status_file(last_log=str(msg), state="failed")
     except Exception:
@@ -6,15 +6,19 @@ from __future__ import annotations
 import argparse
 import hashlib
 import json
+import mmap
 import os
-import queue
 import re
 import shutil
 import subprocess
 import sys
+import tarfile
 import threading
 import time
-import subprocess
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager, nullcontext
+from functools import lru_cache
 from pathlib import Path
 from typing import Dict, List, Tuple, Set, Optional
 from urllib.parse import urlsplit, urlunsplit
@@ -23,6 +27,29 @@ import requests
 from requests.adapters import HTTPAdapter
 from urllib3.util.retry import Retry
 
+try:
+    import fcntl  # POSIX only: FICLONE reflink copies in copy_file
+except ImportError:
+    fcntl = None
+
+try:
+    # optional: much faster content hash for the DB sync compare (pip install blake3)
+    from blake3 import blake3 as _blake3
+except ImportError:
+    _blake3 = None
+
+try:
+    # optional: much faster parser for the set files (preferred when installed)
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    # optional: stream set files card by card instead of building the whole document
+    import ijson
+except ImportError:
+    ijson = None
+
 # --- robust admin utils import (try common locations) ---
 HERE = Path(__file__).resolve().parent           # .../Downloader/Admin/Scripts/WSDownload
 PARENT = HERE.parent                             # .../Downloader/Admin/Scripts
@@ -35,37 +62,50 @@ sys.path.insert(0, str(GRANDPARENT))
 
 try:
     # Preferred: adminUtils.py in Scripts folder (your server uses adminUtils naming)
-    from adminUtils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file
+    from adminUtils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file, flush_status, read_status
 except Exception:
     try:
         # alternate: WSDownload/adminUtils.py
-        from WSDownload.adminUtils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file
+        from WSDownload.adminUtils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file, flush_status, read_status
     except Exception:
         try:
             # alternate underscore variant
-            from admin_utils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file  # type: ignore
+            from admin_utils import parse_common_args, get_out_dir, log, report_progress, fatal, write_status_file, flush_status, read_status  # type: ignore
         except Exception:
             # fallback shim so script still runs standalone
             def parse_common_args():
                 return argparse.Namespace(out_dir=None), None
             def get_out_dir(o):
                 return o or str(GRANDPARENT / "Downloaded")
-            def log(s): print("LOG:", s)
+            _OUT_LOCK = threading.Lock()
+            def _emit(line):
+                # one write per record under a lock: the download/fetch threads log concurrently
+                with _OUT_LOCK:
+                    sys.stdout.write(line + "\n")
+                    sys.stdout.flush()
+            def log(s): _emit(f"LOG: {s}")
             def report_progress(n):
                 # print both friendly log and explicit PROGRESS marker
-                print(f"PROGRESS: {int(n)}")
+                _emit(f"PROGRESS: {int(n)}")
             def fatal(msg, code=1):
-                print("FATAL:", msg)
+                _emit(f"FATAL: {msg}")
                 sys.exit(code)
             def write_status_file(*a, **k):
                 # noop fallback so callers can always call it
                 return
+            def flush_status():
+                return
+            def read_status():
+                return {}
 
 # -------- Tunables (same as before) --------
 DEFAULT_THREADS = 3
 DEFAULT_DELAY = 0.5
 DEFAULT_TIMEOUT = 20
 SKIP_MESSAGE = False
+# status.json only feeds the Admin UI (the server sets WS_STATUS_UI=1 when it spawns a run);
+# headless CLI runs skip the totals/missing bookkeeping that exists just to populate it
+STATUS_UI = bool(os.environ.get("WS_STATUS_UI"))
 
 ENG_REPO = "https://github.com/CCondeluci/WeissSchwarz-ENG-DB"
 JP_REPO  = "https://github.com/CCondeluci/WeissSchwarz-JP-DB"
@@ -91,16 +131,58 @@ def print_result(msg: str, color: str = "", end: str = "\n") -> None:
     log(msg)
 
 # -------- Utilities --------
-def md5_file(p: Path) -> str:
-    h = hashlib.md5()
+# digests are only compared against each other (src vs dst), so any strong hash will do
+_HASH = _blake3 or hashlib.md5
+_file_digest = getattr(hashlib, "file_digest", None)  # Python 3.11+: read loop runs in C
+IO_CHUNK = 1024 * 1024  # hashing, archive extraction and image downloads
+
+def hash_file(p: Path) -> str:
     with p.open("rb") as f:
-        for chunk in iter(lambda: f.read(65536), b""):
+        if _file_digest is not None:
+            return _file_digest(f, _HASH).hexdigest()
+        h = _HASH()
+        for chunk in iter(lambda: f.read(IO_CHUNK), b""):
             h.update(chunk)
-    return h.hexdigest()
+        return h.hexdigest()
 
 def safe_mkdir(p: Path) -> None:
     p.mkdir(parents=True, exist_ok=True)
 
+FICLONE = 0x40049409  # linux/fs.h: share the source extents (btrfs, xfs reflink), no data written
+
+def _kernel_copy(src_fd: int, dst_fd: int, size: int) -> bool:
+    """Copy src_fd into the empty dst_fd without user-space buffers; False if unsupported here."""
+    if fcntl is not None:
+        try:
+            fcntl.ioctl(dst_fd, FICLONE, src_fd)
+            return True
+        except OSError:
+            pass
+    if hasattr(os, "copy_file_range"):
+        try:
+            left = size
+            while left > 0:
+                n = os.copy_file_range(src_fd, dst_fd, left)
+                if n == 0:
+                    break
+                left -= n
+            return left == 0
+        except OSError:
+            pass
+    return False
+
+def copy_file(src: Path, dst: Path) -> None:
+    """shutil.copy2 equivalent: reflink or in-kernel copy when possible, then copystat."""
+    done = False
+    try:
+        with open(src, "rb") as fsrc, open(dst, "wb") as fdst:
+            done = _kernel_copy(fsrc.fileno(), fdst.fileno(), os.fstat(fsrc.fileno()).st_size)
+    except OSError:
+        done = False
+    if not done:
+        shutil.copyfile(src, dst)
+    shutil.copystat(src, dst)
+
 def run(cmd: List[str], cwd: Path | None = None) -> Tuple[int, str, str]:
     proc = subprocess.Popen(
         cmd, cwd=str(cwd) if cwd else None,
@@ -119,109 +201,230 @@ def fresh_clone(repo_url: str, dest: Path) -> None:
         print_result(f"Git clone failed: {err.strip()}", RED)
         fatal("git clone failed", 1)
 
-def sync_db_folder(temp_repo: Path, dest_json_root: Path) -> Tuple[int, int, int, Set[str], Set[str]]:
+def json_dir_entries(folder: Path) -> List[os.DirEntry]:
+    """*.json files directly in folder, sorted by name: one scandir pass, file type from the dirent."""
+    with os.scandir(folder) as it:
+        entries = [e for e in it if e.name.endswith(".json") and e.is_file()]
+    entries.sort(key=lambda e: e.name)
+    return entries
+
+def fetch_db_archive(session: requests.Session, repo_url: str, dest: Path) -> bool:
+    """
+    Fetch only DB/*.json from the repo's default-branch tarball into <dest>/DB
+    (no .git pack data). The ETag is kept in <dest>/.etag and sent as If-None-Match
+    on the next run; returns False on 304, when <dest>/DB is still current.
+    """
+    db_dir = dest / "DB"
+    etag_path = dest / ".etag"
+    headers = {"Accept": "*/*"}
+    if db_dir.is_dir():
+        try:
+            etag = etag_path.read_text(encoding="utf-8").strip()
+            if etag:
+                headers["If-None-Match"] = etag
+        except OSError:
+            pass
+
+    url = f"{repo_url}/archive/HEAD.tar.gz"
+    with session.get(url, headers=headers, stream=True) as r:
+        if r.status_code == 304:
+            print_result(f"{repo_url}: DB unchanged since last fetch")
+            return False
+        r.raise_for_status()
+        staging = dest.with_name(dest.name + ".new")
+        if staging.exists():
+            shutil.rmtree(staging)
+        safe_mkdir(staging / "DB")
+        print_result(f"Downloading {url} → {dest}")
+        count = 0
+        r.raw.decode_content = True
+        with tarfile.open(fileobj=r.raw, mode="r|gz") as tf:
+            for m in tf:
+                # members look like <repo>-<sha>/DB/<set>.json; take exactly that level, regular files only
+                parts = m.name.split("/")
+                if len(parts) != 3 or parts[1] != "DB" or not parts[2].endswith(".json") or not m.isfile():
+                    continue
+                target = staging / "DB" / parts[2]
+                src = tf.extractfile(m)
+                with target.open("wb") as f:
+                    shutil.copyfileobj(src, f, IO_CHUNK)
+                # keep the archive mtime so unchanged files hit the size+mtime fast path in sync
+                os.utime(target, (m.mtime, m.mtime))
+                count += 1
+        etag = r.headers.get("ETag")
+
+    if dest.exists():
+        shutil.rmtree(dest)
+    staging.rename(dest)
+    if etag:
+        etag_path.write_text(etag, encoding="utf-8")
+    print_result(f"Fetched {count} DB files from {repo_url}")
+    return True
+
+def sync_db_folder(temp_repo: Path, dest_json_root: Path, hash_workers: int = 1) -> Tuple[int, int, int, Set[str], Set[str]]:
     """
     Copy <temp_repo>/DB/*.json -> dest_json_root
     Returns (new, updated, unchanged, new_set_stems, updated_set_stems)
+    Files whose stats differ are hashed on up to hash_workers threads; copies stay serial.
     """
     src = temp_repo / "DB"
     if not src.exists():
-        print_result(f"ERROR: {src} not found in cloned repo.", RED)
+        print_result(f"ERROR: {src} not found in fetched repo.", RED)
         return (0, 0, 0, set(), set())
 
     safe_mkdir(dest_json_root)
     new = updated = unchanged = 0
     new_sets: Set[str] = set()
     upd_sets: Set[str] = set()
+    to_check: List[Tuple[Path, Path]] = []
 
-    for p in sorted(src.glob("*.json")):
-        target = dest_json_root / p.name
-        stem = p.stem
-        if not target.exists():
-            shutil.copy2(p, target)
+    for e in json_dir_entries(src):
+        p = Path(e.path)
+        target = dest_json_root / e.name
+        try:
+            d_st = os.stat(target)
+        except FileNotFoundError:
+            copy_file(p, target)
             new += 1
-            new_sets.add(stem)
+            new_sets.add(p.stem)
+            continue
+        # same size and same whole-second mtime (copy_file preserves it): unchanged without reading either file
+        s_st = e.stat()
+        if s_st.st_size == d_st.st_size and int(s_st.st_mtime) == int(d_st.st_mtime):
+            unchanged += 1
+            continue
+        to_check.append((p, target))
+
+    # hashlib releases the GIL while digesting, so the src/dst pairs hash in parallel
+    def _changed(pair: Tuple[Path, Path]) -> bool:
+        return hash_file(pair[0]) != hash_file(pair[1])
+
+    with ThreadPoolExecutor(max_workers=max(1, hash_workers)) as ex:
+        changed = list(ex.map(_changed, to_check))
+
+    for (p, target), differs in zip(to_check, changed):
+        if differs:
+            copy_file(p, target)
+            updated += 1
+            upd_sets.add(p.stem)
         else:
-            src_hash = md5_file(p)
-            dst_hash = md5_file(target)
-            if src_hash != dst_hash:
-                shutil.copy2(p, target)
-                updated += 1
-                upd_sets.add(stem)
-            else:
-                unchanged += 1
+            unchanged += 1
 
     return new, updated, unchanged, new_sets, upd_sets
 
+def _open_proc_fd_dir() -> int:
+    # unnamed temp inodes need O_TMPFILE plus /proc/self/fd to give them a name afterwards (Linux)
+    if not hasattr(os, "O_TMPFILE"):
+        return -1
+    try:
+        return os.open("/proc/self/fd", os.O_RDONLY | os.O_DIRECTORY)
+    except OSError:
+        return -1
+
+_PROC_FD_DIR = _open_proc_fd_dir()
+
+def _link_tmpfile(fd: int, dst: Path) -> None:
+    # os.link only goes through linkat(AT_SYMLINK_FOLLOW) when a dir fd is given, hence the relative name
+    os.link(str(fd), dst, src_dir_fd=_PROC_FD_DIR, follow_symlinks=True)
+
+@contextmanager
+def atomic_writer(out_path: Path):
+    """
+    Yield a binary file whose contents appear at out_path only once the block completes.
+    Uses an O_TMPFILE inode linked into place (nothing left behind on a crash), else <name>.part + rename.
+    """
+    fd = -1
+    if _PROC_FD_DIR != -1:
+        try:
+            fd = os.open(out_path.parent, os.O_TMPFILE | os.O_WRONLY, 0o666)
+        except OSError:
+            fd = -1  # filesystem without O_TMPFILE support
+    tmp = out_path.with_suffix(out_path.suffix + ".part")
+    if fd == -1:
+        with tmp.open("wb") as f:
+            yield f
+        tmp.replace(out_path)
+        return
+    with os.fdopen(fd, "wb") as f:
+        yield f
+        f.flush()
+        try:
+            _link_tmpfile(fd, out_path)
+        except FileExistsError:
+            # forced re-download over an existing file: link next to it, then rename over it
+            try:
+                tmp.unlink()
+            except FileNotFoundError:
+                pass
+            _link_tmpfile(fd, tmp)
+            tmp.replace(out_path)
+
 # -------- URL helpers --------
-def alternate_urls(u: str) -> List[str]:
+_WP_CARDIMAGES = "/wp/wp-content/images/cardimages/"
+_CARDLIST_CARDIMAGES = "/cardlist/cardimages/"
+_CARDIMAGES = "/cardimages/"
+
+@lru_cache(maxsize=8192)
+def alternate_urls(u: str) -> Tuple[str, ...]:
+    # memoized: the same URLs come back on retries and across the ENG/JP passes (returns an immutable tuple)
     alts: List[str] = []
     sp = urlsplit(u)
     path = sp.path
 
-    if "/wp/wp-content/images/cardimages/" in path:
-        alts.append(urlunsplit(sp._replace(path=path.replace("/wp/wp-content/images/cardimages/",
-                                                             "/cardlist/cardimages/"))))
-    if "/cardlist/cardimages/" in path:
-        alts.append(urlunsplit(sp._replace(path=path.replace("/cardlist/cardimages/",
-                                                             "/wp/wp-content/images/cardimages/"))))
+    if _WP_CARDIMAGES in path:
+        alts.append(urlunsplit(sp._replace(path=path.replace(_WP_CARDIMAGES, _CARDLIST_CARDIMAGES))))
+    if _CARDLIST_CARDIMAGES in path:
+        alts.append(urlunsplit(sp._replace(path=path.replace(_CARDLIST_CARDIMAGES, _WP_CARDIMAGES))))
 
-    idx = path.lower().find("/cardimages/")
+    idx = path.lower().find(_CARDIMAGES)
     if idx != -1:
-        prefix = path[:idx+len("/cardimages/")]
-        suffix = path[idx+len("/cardimages/"):]
-        lower_path = prefix + suffix.lower()
+        cut = idx + len(_CARDIMAGES)
+        lower_path = path[:cut] + path[cut:].lower()
         if lower_path != path:
             alts.append(urlunsplit(sp._replace(path=lower_path)))
 
     # dedupe preserving order
-    seen = set()
-    uniq: List[str] = []
-    for a in alts:
-        if a not in seen:
-            uniq.append(a); seen.add(a)
-    return uniq
+    return tuple(dict.fromkeys(alts))
+
+def _load_settings() -> dict:
+    try:
+        raw = SETTINGS_PATH.read_bytes()
+        data = orjson.loads(raw) if orjson is not None else json.loads(raw)
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+# Admin/settings.json, parsed once at import (the script is a one-shot run)
+SETTINGS_PATH = ROOT.parent / "settings.json"
+_SETTINGS = _load_settings()
+_PYTHON_BIN = sys.executable or "python3"
 
 def try_autorun_manifest():
     """
-    Look for Admin/settings.json and, if autoManifest is true, spawn generateManifest.py.
+    If Admin/settings.json has autoManifest true, spawn generateManifest.py (non-blocking).
     Pass DOWNLOADS_ROOT or OUT_DIR into the manifest's environment so it finds the DBs in Docker.
     """
     try:
-        this_file = Path(__file__).resolve()
-        ws_dir = this_file.parent            # .../Scripts/WSDownload
-        scripts_dir = ws_dir.parent          # .../Scripts
-        admin_root = scripts_dir.parent      # .../Admin
-        settings_path = admin_root / "settings.json"
-
-        auto_manifest = False
-        if settings_path.exists():
-            try:
-                s = json.loads(settings_path.read_text(encoding="utf-8"))
-                auto_manifest = bool(s.get("autoManifest", False))
-            except Exception:
-                auto_manifest = False
-
-        if not auto_manifest:
+        if not bool(_SETTINGS.get("autoManifest", False)):
             return
 
         # prefer explicit DOWNLOADS_ROOT env variable (set in docker compose), else try admin_root/Downloaded
-        downloads_root = os.environ.get("DOWNLOADS_ROOT") or os.environ.get("OUT_DIR") or str(admin_root / "Downloaded")
+        downloads_root = os.environ.get("DOWNLOADS_ROOT") or os.environ.get("OUT_DIR") or str(ROOT.parent / "Downloaded")
 
-        manifest_script = scripts_dir / "Manifest" / "generateManifest.py"
+        manifest_script = ROOT / "Manifest" / "generateManifest.py"
         if not manifest_script.exists():
             print(f"[auto-manifest] manifest script not found at {manifest_script}")
             return
 
-        python_bin = sys.executable or "python3"
         child_env = dict(os.environ)
         # tell the manifest generator where the DBs are mounted
         child_env["DOWNLOADS_ROOT"] = downloads_root
         child_env["OUT_DIR"] = os.environ.get("OUT_DIR", "")  # preserve existing if present
+        child_env["PYTHONUNBUFFERED"] = "1"
 
         # spawn detached so manifest runs independently
         try:
-            p = subprocess.Popen([python_bin, "-u", str(manifest_script)],
+            p = subprocess.Popen([_PYTHON_BIN, "-u", str(manifest_script)],
                                  cwd=str(manifest_script.parent),
                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE,
                                  env=child_env)
@@ -231,204 +434,228 @@ def try_autorun_manifest():
 
     except Exception as e:
         print(f"[auto-manifest] unexpected error: {e}")
-    """
-    Look for Admin/settings.json (Admin/settings.json relative to Scripts folder)
-    and, if autoManifest is true, spawn the generateManifest.py script.
-    """
-    try:
-        # Derive Admin root from this WSDownload file location:
-        # wsDownload.py is in Scripts/WSDownload/, so go up three levels to Admin:
-        this_file = Path(__file__).resolve()
-        ws_dir = this_file.parent            # .../Scripts/WSDownload
-        scripts_dir = ws_dir.parent          # .../Scripts
-        admin_root = scripts_dir.parent      # .../Admin
-        settings_path = admin_root / "settings.json"
-
-        auto_manifest = False
-        if settings_path.exists():
-            try:
-                s = json.loads(settings_path.read_text(encoding="utf-8"))
-                auto_manifest = bool(s.get("autoManifest", False))
-            except Exception:
-                # fallback to false on parse error
-                auto_manifest = False
-
-        if not auto_manifest:
-            # nothing to do
-            return
-
-        # locate generateManifest.py
-        manifest_script = scripts_dir / "Manifest" / "generateManifest.py"
-        if not manifest_script.exists():
-            # log if you have a logging function; otherwise print
-            try:
-                print(f"[auto-manifest] manifest script not found at {manifest_script}")
-            except Exception:
-                pass
-            return
-
-        # spawn python to run the generator (non-blocking)
-        try:
-            python_bin = sys.executable or "python3"
-            # -u to ensure unbuffered python output
-            p = subprocess.Popen([python_bin, "-u", str(manifest_script)], cwd=str(manifest_script.parent),
-                                  stdout=subprocess.PIPE, stderr=subprocess.PIPE, env=dict(**os.environ, PYTHONUNBUFFERED="1"))
-            # optional: print the PID to the logs
-            try:
-                print(f"[auto-manifest] spawned {manifest_script} (PID: {p.pid})")
-            except Exception:
-                pass
-            # don't wait — let it run; you can optionally read its stdout in background or detach
-        except Exception as e:
-            try:
-                print(f"[auto-manifest] failed to spawn manifest: {e}")
-            except Exception:
-                pass
 
-    except Exception as e:
-        try:
-            print(f"[auto-manifest] unexpected error: {e}")
-        except Exception:
-            pass
-        
 # -------- Extraction helpers --------
 URL_RE = re.compile(r'https?://[^\s"\']+', re.IGNORECASE)
 IMG_EXT_RE = re.compile(r'\.(?:jpg|jpeg|png)(?:\?.*)?$', re.IGNORECASE)
 CODE_RE = re.compile(r'(?i)\b([A-Z0-9]{1,6})/([A-Z0-9]{1,4})-([A-Z0-9]{1,5})\b')
+CODE_RE_B = re.compile(CODE_RE.pattern.encode("ascii"))  # same pattern over raw file bytes
+
+_IMG_EXTS = frozenset((".jpg", ".jpeg", ".png"))
 
 def ext_from_url(u: str) -> str:
+    # urlsplit already drops the query; the extension is whatever follows the last dot
     path = urlsplit(u).path.lower()
-    if path.endswith(".jpeg"):
-        return ".jpeg"
-    if path.endswith(".jpg"):
-        return ".jpg"
-    if path.endswith(".png"):
-        return ".png"
-    m = IMG_EXT_RE.search(path)
-    if m:
-        ext = m.group(0)
-        q = ext.find("?")
-        return ext[:q] if q != -1 else ext
-    return ".png"
-
-def find_image_url_in_card(card: dict) -> Optional[str]:
-    for k in ("image", "Image", "img", "Img", "imageUrl", "ImageUrl", "imageURL", "ImageURL"):
-        v = card.get(k)
-        if isinstance(v, str) and (IMG_EXT_RE.search(v.lower()) or "/cardimages/" in v):
-            return v
-    for v in card.values():
-        if isinstance(v, str) and (IMG_EXT_RE.search(v.lower()) or "/cardimages/" in v):
-            if v.startswith("http://") or v.startswith("https://"):
-                return v
-    return None
-
-def find_code_in_card(card: dict, key_hint: Optional[str]=None) -> Optional[str]:
-    if key_hint and isinstance(key_hint, str):
-        m = CODE_RE.search(key_hint)
-        if m:
-            return f"{m.group(1).upper()}/{m.group(2).upper()}-{m.group(3).upper()}"
-    for k in ("code", "CardCode", "cardCode", "id", "ID", "number", "Number"):
-        v = card.get(k)
-        if isinstance(v, str):
-            m = CODE_RE.search(v)
-            if m:
-                return f"{m.group(1).upper()}/{m.group(2).upper()}-{m.group(3).upper()}"
-    for v in card.values():
-        if isinstance(v, str):
-            m = CODE_RE.search(v)
-            if m:
-                return f"{m.group(1).upper()}/{m.group(2).upper()}-{m.group(3).upper()}"
-    return None
-
-def canonical_set_key_from_json_first_code(json_path: Path, fallback_stem: str) -> str:
-    try:
-        with json_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-        def walk_first_code(node) -> Optional[str]:
-            if isinstance(node, dict):
-                for k in ("code", "CardCode", "cardCode", "id", "ID", "number", "Number"):
-                    v = node.get(k)
-                    if isinstance(v, str):
-                        m = CODE_RE.search(v)
-                        if m:
-                            return f"{m.group(1).upper()}_{m.group(2).upper()}"
-                for v in node.values():
-                    got = walk_first_code(v)
-                    if got: return got
-            elif isinstance(node, list):
-                for v in node:
-                    got = walk_first_code(v)
-                    if got: return got
-            elif isinstance(node, str):
-                m = CODE_RE.search(node)
+    dot = path.rfind(".")
+    ext = path[dot:] if dot != -1 else ""
+    return ext if ext in _IMG_EXTS else ".png"
+
+# named keys in lookup priority order (lower rank wins over a later hit in dict order)
+_IMG_KEYS = {k: i for i, k in enumerate(("image", "Image", "img", "Img", "imageUrl", "ImageUrl", "imageURL", "ImageURL"))}
+_CODE_KEYS = {k: i for i, k in enumerate(("code", "CardCode", "cardCode", "id", "ID", "number", "Number"))}
+
+def scan_card(card: dict, key_hint: Optional[str]=None) -> Tuple[Optional[str], Optional[str]]:
+    """
+    One pass over card.items() returning (card sid, image url), either may be None.
+    Picks match the old separate lookups: a code in key_hint wins, then the named keys in
+    priority order, then the first matching value in dict order (URLs: http(s) only).
+    """
+    n_code, n_img = len(_CODE_KEYS), len(_IMG_KEYS)
+    code_m = CODE_RE.search(key_hint) if key_hint and isinstance(key_hint, str) else None
+    code_rank = -1 if code_m else n_code + 1
+    url: Optional[str] = None
+    url_rank = n_img + 1
+    for k, v in card.items():
+        if not isinstance(v, str):
+            continue
+        # literal prefilters: a code needs "/" and "-", an extension match needs ".",
+        # so most names/texts are rejected by C substring checks before any regex runs
+        if code_rank > 0 and "/" in v and "-" in v:
+            r = _CODE_KEYS.get(k, n_code)
+            if r < code_rank:
+                m = CODE_RE.search(v)
                 if m:
-                    return f"{m.group(1).upper()}_{m.group(2).upper()}"
-            return None
-        got = walk_first_code(data)
-        if got: return got
-    except Exception:
-        pass
+                    code_m, code_rank = m, r
+        if url_rank > 0:
+            r = _IMG_KEYS.get(k, n_img)
+            if (r < url_rank and (r < n_img or v.startswith(("http://", "https://")))
+                    and ("/cardimages/" in v or ("." in v and IMG_EXT_RE.search(v.lower())))):
+                url, url_rank = v, r
+    return (code_m.group(3).upper() if code_m else None), url
+
+MMAP_MIN_BYTES = 256 * 1024  # below this a plain read is cheaper than setting up a mapping
+
+@contextmanager
+def set_json_buffer(json_path: str):
+    """
+    Yield one set file's contents for both the canonical key and the pairs: bytes for small
+    files, a read-only mmap from MMAP_MIN_BYTES up (paged in on demand, no full-file copy).
+    Yields b"" when the file cannot be opened.
+    """
     try:
-        text = json_path.read_text(encoding="utf-8", errors="ignore")
-        m = CODE_RE.search(text)
+        f = open(json_path, "rb")
+    except OSError:
+        yield b""
+        return
+    with f:
+        if os.fstat(f.fileno()).st_size < MMAP_MIN_BYTES:
+            yield f.read()
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            yield mm
+
+# a string value held by one of the code keys (_CODE_KEYS), as raw JSON bytes
+_CODE_VALUE_RE_B = re.compile(rb'"(?:code|CardCode|cardCode|id|ID|number|Number)"[ \t\r\n]*:[ \t\r\n]*"((?:[^"\\]|\\.)*)"')
+
+def canonical_set_key_from_json_first_code(raw, fallback_stem: str) -> str:
+    """
+    SET_RELEASE from the first card code in the file, found with C-level scans over the raw
+    bytes instead of a walk over the parsed tree. Codes held by a code key come first, so a
+    code-shaped string in a name or text field ahead of the card's own code does not win;
+    only when no code key has one does any string count (as in the tree walk). Among code
+    keys the first one in file order wins, where the walk preferred "code" over "id" etc.
+    inside the same card (the DB set files only use "code").
+    """
+    for kv in _CODE_VALUE_RE_B.finditer(raw):
+        v = kv.group(1)
+        if b"\\" in v:
+            try:
+                v = json.loads(b'"' + v + b'"').encode("utf-8")
+            except ValueError:
+                continue
+        m = CODE_RE_B.search(v)
         if m:
-            return f"{m.group(1).upper()}_{m.group(2).upper()}"
-    except Exception:
-        pass
+            return f"{m.group(1).decode('ascii').upper()}_{m.group(2).decode('ascii').upper()}"
+    m = CODE_RE_B.search(raw)
+    if m:
+        return f"{m.group(1).decode('ascii').upper()}_{m.group(2).decode('ascii').upper()}"
     return fallback_stem
 
-def extract_pairs_from_json(json_path: Path) -> List[Tuple[str, str]]:
+def extract_pairs_from_json(raw) -> List[Tuple[str, str]]:
+    # raw: bytes or an mmap of the set file (see set_json_buffer)
     pairs: List[Tuple[str, str]] = []
 
     def push(card: dict, key_hint: Optional[str]=None):
-        code = find_code_in_card(card, key_hint)
-        if not code:
-            return
-        m = CODE_RE.search(code)
-        if not m:
-            return
-        sid = m.group(3).upper()
-        url = find_image_url_in_card(card)
-        if not url:
-            return
-        pairs.append((sid, url))
+        sid, url = scan_card(card, key_hint)
+        if sid and url:
+            pairs.append((sid, url))
+
+    def walk(items, kvs) -> None:
+        for item in items:
+            if isinstance(item, dict):
+                push(item)
+        for k, v in kvs:
+            if isinstance(v, dict):
+                push(v, key_hint=k)
+            elif isinstance(v, list):
+                for it in v:
+                    if isinstance(it, dict):
+                        push(it)
 
     try:
-        with json_path.open("r", encoding="utf-8") as f:
-            data = json.load(f)
-
+        if raw[:3] == b"\xef\xbb\xbf":
+            raw = raw[3:]
+        top = raw[:64].lstrip()[:1]
+        if orjson is not None:
+            # fastest full parse, straight over the mapping; the stdlib still takes what orjson
+            # rejects (NaN/Infinity literals). The view is released before the mmap is closed.
+            try:
+                with memoryview(raw) as view:
+                    data = orjson.loads(view)
+            except orjson.JSONDecodeError:
+                data = json.loads(raw[:])
+        elif ijson is not None and top in (b"[", b"{"):
+            # stream the top-level container: only one card dict is alive at a time
+            try:
+                if top == b"[":
+                    walk(ijson.items(raw, "item", use_float=True), ())
+                else:
+                    walk((), ijson.kvitems(raw, "", use_float=True))
+                return pairs
+            except ijson.JSONError:
+                # the stream parser also rejects NaN/Infinity: start over with the lenient full parse
+                pairs.clear()
+                data = json.loads(raw[:])
+        else:
+            data = json.loads(raw[:])
         if isinstance(data, list):
-            for item in data:
-                if isinstance(item, dict):
-                    push(item)
+            walk(data, ())
         elif isinstance(data, dict):
-            for k, v in data.items():
-                if isinstance(v, dict):
-                    push(v, key_hint=k)
-                elif isinstance(v, list):
-                    for it in v:
-                        if isinstance(it, dict):
-                            push(it)
+            walk((), data.items())
     except Exception:
-        pass
+        # unparsable file: contributes no pairs (nothing partial from a stream that broke midway)
+        return []
 
     return pairs
 
-def harvest_pairs_by_set(json_root: Path) -> Tuple[Dict[str, List[Tuple[str, str]]], Dict[str, str]]:
-    mapping: Dict[str, List[Tuple[str, str]]] = {}
+def prefetch_files(paths: List[str]) -> None:
+    """
+    Queue kernel readahead for every set file up front, so the reads below are served
+    from the page cache instead of blocking one file at a time. No-op without posix_fadvise.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    for p in paths:
+        try:
+            fd = os.open(p, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass
+
+# (mapping, stem_to_canon, total) as returned by harvest_pairs_by_set
+Harvest = Tuple[Dict[str, List[Tuple[str, str, str]]], Dict[str, str], int]
+
+def harvest_pairs_by_set(json_root: Path) -> Harvest:
+    """
+    {canonical_set_key: [(sid, url, fname), ...]}, the stem -> canonical key map and the
+    total number of pairs.
+    fname (sid + image extension) is derived here once so the planner and count_missing
+    only join paths.
+    """
+    mapping: Dict[str, List[Tuple[str, str, str]]] = {}
     stem_to_canon: Dict[str, str] = {}
-    json_files = sorted(json_root.glob("*.json"))
-    for jf in json_files:
-        stem = jf.stem
-        canon = canonical_set_key_from_json_first_code(jf, stem)
+    total = 0
+    try:
+        entries = json_dir_entries(json_root)
+    except FileNotFoundError:
+        entries = []
+    prefetch_files([e.path for e in entries])
+    for e in entries:
+        stem = e.name[:-5]
+        with set_json_buffer(e.path) as raw:
+            canon = canonical_set_key_from_json_first_code(raw, stem)
+            pairs = extract_pairs_from_json(raw)
         stem_to_canon[stem] = canon
-        pairs = extract_pairs_from_json(jf)
         if pairs:
-            mapping.setdefault(canon, []).extend(pairs)
-    return mapping, stem_to_canon
+            mapping.setdefault(canon, []).extend([(sid, url, sid + ext_from_url(url)) for sid, url in pairs])
+            total += len(pairs)
+    return mapping, stem_to_canon, total
 
 # -------- Downloading (with progress) --------
-def build_session(timeout: int) -> requests.Session:
+@lru_cache(maxsize=64)
+def _referer_for_host(host: str) -> str:
+    return f"https://{host}/"
+
+class TimeoutHTTPAdapter(HTTPAdapter):
+    """
+    HTTPAdapter that fills in the default timeout and a per-host Referer at send time,
+    so callers can use the plain session methods without a wrapped request().
+    """
+    def __init__(self, *args, timeout: Optional[float] = None, **kwargs):
+        self.timeout = timeout
+        super().__init__(*args, **kwargs)
+
+    def send(self, request, **kwargs):
+        if kwargs.get("timeout") is None:
+            kwargs["timeout"] = self.timeout
+        if "Referer" not in request.headers:
+            request.headers["Referer"] = _referer_for_host(urlsplit(request.url).netloc)
+        return super().send(request, **kwargs)
+
+def build_session(timeout: int, pool_maxsize: int = 100) -> requests.Session:
     sess = requests.Session()
     retry = Retry(
         total=3,
@@ -437,7 +664,7 @@ def build_session(timeout: int) -> requests.Session:
         allowed_methods=frozenset(["GET"]),
         respect_retry_after_header=True,
     )
-    adapter = HTTPAdapter(max_retries=retry, pool_connections=100, pool_maxsize=100)
+    adapter = TimeoutHTTPAdapter(max_retries=retry, pool_connections=100, pool_maxsize=pool_maxsize, timeout=timeout)
     sess.mount("http://", adapter)
     sess.mount("https://", adapter)
     sess.headers.update({
@@ -447,101 +674,111 @@ def build_session(timeout: int) -> requests.Session:
         "Accept-Language": "en-US,en;q=0.9",
         "Connection": "keep-alive",
     })
-    orig = sess.request
-    def with_timeout(method, url, **kw):
-        if "timeout" not in kw:
-            kw["timeout"] = timeout
-        headers = kw.setdefault("headers", {})
-        if "Referer" not in headers:
-            host = urlsplit(url).netloc
-            headers["Referer"] = f"https://{host}/"
-        return orig(method, url, **kw)
-    sess.request = with_timeout  # type: ignore
     return sess
 
-def plan_downloads(mapping: Dict[str, List[Tuple[str, str]]], dest_root: Path, force_sets: Set[str]) -> List[Tuple[str, Path]]:
+def prewarm_hosts(session: requests.Session, urls, timeout: float = 5) -> None:
+    """
+    One HEAD per distinct scheme://host before the workers start, so DNS lookups and TCP/TLS
+    handshakes happen in parallel up front and the first downloads find a pooled connection.
+    Best-effort: failures are ignored, the real GETs retry on their own.
+    """
+    origins = {f"{sp.scheme}://{sp.netloc}/" for sp in map(urlsplit, urls) if sp.netloc}
+    if not origins:
+        return
+
+    def _head(origin: str) -> None:
+        try:
+            session.head(origin, timeout=timeout).close()
+        except requests.RequestException:
+            pass
+
+    with ThreadPoolExecutor(max_workers=min(8, len(origins))) as ex:
+        list(ex.map(_head, origins))
+
+def plan_downloads(mapping: Dict[str, List[Tuple[str, str, str]]], dest_root: Path, force_sets: Set[str]) -> List[Tuple[str, Path]]:
     plan: List[Tuple[str, Path]] = []
+    _lexists = os.path.lexists
     for set_key, pairs in mapping.items():
         force = set_key in force_sets
-        for sid, url in pairs:
-            fname = f"{sid}{ext_from_url(url)}"
-            out_path = dest_root / set_key / fname
-            if out_path.exists() and not force:
+        set_dir = dest_root / set_key
+        set_dir_str = os.path.join(str(set_dir), "")
+        for sid, url, fname in pairs:
+            # probe the plain str path; a Path is only built for entries that get planned
+            if not force and _lexists(set_dir_str + fname):
                 if SKIP_MESSAGE:
-                    print_result(f"skip  {out_path}", GREY)
+                    print_result(f"skip  {set_dir / fname}", GREY)
                 else:
                     # skip quietly
                     time.sleep(0)
             else:
-                plan.append((url, out_path))
+                plan.append((url, set_dir / fname))
     return plan
 
-def download_worker(work_q: "queue.Queue[Tuple[str, Path]]", delay: float, session: requests.Session, lock: threading.Lock, progress_state: dict):
+DOWNLOAD_BATCH = 16
+
+def advance_progress(progress_state: dict) -> Optional[int]:
+    """
+    Count one finished plan item (caller holds the progress lock). Emits PROGRESS and returns
+    the new percent only when the integer value moved, else None, so status/SSE see one update per percent.
+    """
+    progress_state["done"] += 1
+    total = progress_state.get("total", 0) or 1
+    pct = int(progress_state["done"] / total * 100)
+    if pct == progress_state.get("last_pct"):
+        return None
+    progress_state["last_pct"] = pct
+    report_progress(pct)
+    return pct
+
+def download_worker(work_q: "deque[Tuple[str, Path]]", q_lock: threading.Lock, n_workers: int, delay: float, session: requests.Session, lock: threading.Lock, progress_state: dict):
+    batch: List[Tuple[str, Path]] = []
     while True:
-        try:
-            url, out_path = work_q.get_nowait()
-        except queue.Empty:
-            return
+        if not batch:
+            # take several items per lock acquire, but never more than a fair share of what is
+            # left so the tail of the plan still spreads across all workers
+            with q_lock:
+                n = min(DOWNLOAD_BATCH, max(1, len(work_q) // n_workers), len(work_q))
+                batch = [work_q.popleft() for _ in range(n)]
+            if not batch:
+                return
+            batch.reverse()
+        url, out_path = batch.pop()
 
         performed_request = False
         try:
             out_path.parent.mkdir(parents=True, exist_ok=True)
 
-            tried = [url] + alternate_urls(url)
+            tried = (url,) + alternate_urls(url)
             success = False
             last_status = None
 
             for candidate in tried:
-                r = session.get(candidate, stream=True)
-                performed_request = True
-                last_status = r.status_code
-                if r.status_code == 200:
-                    tmp = out_path.with_suffix(out_path.suffix + ".part")
-                    with tmp.open("wb") as f:
-                        for chunk in r.iter_content(1024 * 64):
-                            if chunk:
-                                f.write(chunk)
-                    tmp.replace(out_path)
-                    with lock:
-                        print_result(f"done  {out_path}", GREEN)
-                        # update progress
-                        progress_state["done"] += 1
-                        total = progress_state.get("total", 0) or 1
-                        pct = int(progress_state["done"] / total * 100) if total else 100
-                        # emit PROGRESS line for external listeners
-                        report_progress(pct)
-                        print(f"PROGRESS: {pct}")
-                    try:
-                        # prepare percent_details for status.json
-                        total = progress_state.get("total", 0) or 1
-                        done = progress_state.get("done", 0)
-                        # current job percent (0..100)
-                        cur_pct = int(done / total * 100) if total else 100
-
-                        # Use out_path to decide ENG vs JP (no undefined dest_root)
-                        out_path_str = str(out_path).lower()
-                        is_eng = "/db-eng/" in out_path_str or "\\db-eng\\" in out_path_str or "db-eng" in out_path_str
-                        is_jp  = "/db-jp/" in out_path_str or "\\db-jp\\" in out_path_str or "db-jp" in out_path_str
-
-                        # Set only the language-specific currentpercent field to avoid overwriting overall
-                        pd = {}
-                        if is_eng and not is_jp:
-                            pd["currentpercenteng"] = float(cur_pct)
-                        elif is_jp and not is_eng:
-                            pd["currentpercentjp"] = float(cur_pct)
-                        else:
-                            # ambiguous/both -> set generic currentpercent so UI can show combined overlay
-                            pd["currentpercent"] = float(cur_pct)
-
-                        # attempt to write status file with latest percent_details and last_log
-                        write_status_file(percent_details=pd, last_log=f"done  {out_path}")
-                    except Exception:
-                        pass
-
-                    success = True
-                    break
-                if r.status_code != 404:
-                    break
+                # context-managed so 404/other bodies are released and the keep-alive connection
+                # goes back to the pool instead of waiting for the response to be garbage collected
+                with session.get(candidate, stream=True) as r:
+                    performed_request = True
+                    last_status = r.status_code
+                    if r.status_code == 200:
+                        # copy loop runs in C with 1 MiB reads; decode_content undoes any gzip transfer encoding
+                        r.raw.decode_content = True
+                        with atomic_writer(out_path) as f:
+                            shutil.copyfileobj(r.raw, f, IO_CHUNK)
+                        with lock:
+                            print_result(f"done  {out_path}", GREEN)
+                            pct = advance_progress(progress_state)
+                            if pct is not None:
+                                try:
+                                    # Set only the language-specific currentpercent field to avoid overwriting overall
+                                    # (queued under the lock so percents reach status.json in order)
+                                    write_status_file(percent_details={progress_state["percent_key"]: float(pct)},
+                                                      last_log=f"done  {out_path}")
+                                except Exception:
+                                    pass
+
+                        success = True
+                        break
+                    if r.status_code != 404:
+                        break
 
             if not success:
                 with lock:
@@ -549,176 +786,183 @@ def download_worker(work_q: "queue.Queue[Tuple[str, Path]]", delay: float, sessi
                         print_result(f"warn  {url} → HTTP 404 (not found)", YELL)
                     else:
                         print_result(f"warn  {url} → HTTP {last_status}", YELL)
-                    progress_state["done"] += 1
-                    total = progress_state.get("total", 0) or 1
-                    pct = int(progress_state["done"] / total * 100) if total else 100
-                    report_progress(pct)
-                    print(f"PROGRESS: {pct}")
+                    advance_progress(progress_state)
 
         except Exception as e:
             with lock:
                 print_result(f"error {url} → {e}", RED)
-                progress_state["done"] += 1
-                total = progress_state.get("total", 0) or 1
-                pct = int(progress_state["done"] / total * 100) if total else 100
-                report_progress(pct)
-                print(f"PROGRESS: {pct}")
+                advance_progress(progress_state)
         finally:
             if performed_request and delay > 0:
                 time.sleep(delay)
-            work_q.task_done()
 
-def execute_download_plan(plan: List[Tuple[str, Path]], threads: int, delay: float, timeout: int):
+def percent_key_for(out_path: Path) -> str:
+    """status.json percent_details key for downloads under out_path (all of a plan shares one DB root)."""
+    parts = {p.lower() for p in out_path.parts}
+    is_eng = "db-eng" in parts
+    is_jp = "db-jp" in parts
+    if is_eng and not is_jp:
+        return "currentpercenteng"
+    if is_jp and not is_eng:
+        return "currentpercentjp"
+    # ambiguous/both -> set generic currentpercent so UI can show combined overlay
+    return "currentpercent"
+
+def execute_download_plan(plan: List[Tuple[str, Path]], threads: int, delay: float, timeout: int, session: Optional[requests.Session] = None):
     if not plan:
         log("Nothing to download.")
         report_progress(100)
-        print("PROGRESS: 100")
         return
-    sess = build_session(timeout)
-    work_q: "queue.Queue[Tuple[str, Path]]" = queue.Queue()
-    lock = threading.Lock()
-
-    for item in plan:
-        work_q.put(item)
-
-    progress_state = {"done": 0, "total": len(plan)}
-    report_progress(0)
-    print("PROGRESS: 0")
-
-    workers = []
-    for _ in range(max(1, threads)):
-        t = threading.Thread(target=download_worker, args=(work_q, delay, sess, lock, progress_state), daemon=True)
-        t.start()
-        workers.append(t)
-
-    work_q.join()
-    # ensure 100% at finish
-    report_progress(100)
-    print("PROGRESS: 100")
-    log(f"downloaded {progress_state['done']} / {progress_state['total']} files")
+    n_workers = max(1, threads)
+    # keep-alive pool per host sized to the actual concurrency (a worker may hold one spare while probing alternates)
+    # a borrowed session stays open for the caller; one built here is closed when the pass ends
+    owned = nullcontext(session) if session is not None else build_session(timeout, pool_maxsize=n_workers * 2)
+    with owned as sess:
+        prewarm_hosts(sess, (u for u, _ in plan))
+        work_q: "deque[Tuple[str, Path]]" = deque(plan)
+        q_lock = threading.Lock()
+        lock = threading.Lock()
+
+        progress_state = {"done": 0, "total": len(plan), "last_pct": 0, "percent_key": percent_key_for(plan[0][1])}
+        report_progress(0)
+
+        workers = []
+        for _ in range(n_workers):
+            t = threading.Thread(target=download_worker, args=(work_q, q_lock, n_workers, delay, sess, lock, progress_state), daemon=True)
+            t.start()
+            workers.append(t)
+
+        # the deque is filled up front, so every worker exits once it is drained
+        for t in workers:
+            t.join()
+        # ensure 100% at finish
+        report_progress(100)
+        log(f"downloaded {progress_state['done']} / {progress_state['total']} files")
 
-def download_images_by_set(mapping: Dict[str, List[Tuple[str, str]]], dest_root: Path, force_sets: Set[str], threads: int, delay: float, timeout: int, lang: Optional[str] = None):
+def download_images_by_set(mapping: Dict[str, List[Tuple[str, str, str]]], dest_root: Path, force_sets: Set[str], threads: int, delay: float, timeout: int, lang: Optional[str] = None, total: Optional[int] = None, session: Optional[requests.Session] = None):
     """
     Download images described by `mapping` into `dest_root`.
-    - mapping: {canonical_set_key: [(sid, url), ...], ...}
+    - mapping: {canonical_set_key: [(sid, url, fname), ...], ...}
     - dest_root: destination root path for images (e.g. /.../DB-ENG/Images)
     - force_sets: set of canonical set keys to force redownload
     - threads, delay, timeout: download worker params
     - lang: Optional "ENG" or "JP" to indicate which language this run is for (used to set proper totalfiles keys)
+    - total: number of pairs in mapping, when the caller already has it from the harvest
+    - session: HTTP session to download with (shared across passes); a fresh one is built when omitted
     Side effects:
     - Writes/merges status.json via write_status_file to publish totals and progress.
     - Emits PROGRESS: <n> lines via report_progress as the workers make progress.
     """
-    total = sum(len(v) for v in mapping.values())
+    if total is None:
+        total = sum(len(v) for v in mapping.values())
 
     print_section(f"Planning {total} images → {dest_root}")
     plan = plan_downloads(mapping, dest_root, force_sets)
 
     planned_count = len(plan)
-    try:
-        # Prepare canonical, complete structures for merging into status.json.
-        status_path = Path(get_out_dir(None)) / "status.json"
-        merged_totalfiles = {"engtotal": 0, "jptotal": 0, "engmissing": 0, "jpmissing": 0}
-        merged_pd = {
-            "totalpercent": 0.0,
-            "totalpercenteng": 0.0,
-            "totalpercentjp": 0.0,
-            "currentpercent": 0.0,
-            "currentpercenteng": 0.0,
-            "currentpercentjp": 0.0
-        }
-
-        # If an existing status.json is present, load its keys safely into merged structures.
-        if status_path.exists():
-            try:
-                existing = json.loads(status_path.read_text(encoding="utf-8"))
-            except Exception:
-                existing = {}
+    if STATUS_UI:
+        try:
+            # Prepare canonical, complete structures for merging into status.json.
+            merged_totalfiles = {"engtotal": 0, "jptotal": 0, "engmissing": 0, "jpmissing": 0}
+            merged_pd = {
+                "totalpercent": 0.0,
+                "totalpercenteng": 0.0,
+                "totalpercentjp": 0.0,
+                "currentpercent": 0.0,
+                "currentpercenteng": 0.0,
+                "currentpercentjp": 0.0
+            }
+
+            # If a status is already known, load its keys safely into merged structures.
+            # (read_status includes updates the background writer has not flushed to disk yet)
+            existing = read_status()
+            if existing:
+                existing_tf = existing.get("totalfiles", {})
+                for k in ("engtotal", "jptotal", "engmissing", "jpmissing"):
+                    try:
+                        merged_totalfiles[k] = int(existing_tf.get(k, merged_totalfiles[k]) or merged_totalfiles[k])
+                    except Exception:
+                        merged_totalfiles[k] = merged_totalfiles[k]
 
-            existing_tf = existing.get("totalfiles", {})
-            for k in ("engtotal", "jptotal", "engmissing", "jpmissing"):
-                try:
-                    merged_totalfiles[k] = int(existing_tf.get(k, merged_totalfiles[k]) or merged_totalfiles[k])
-                except Exception:
-                    merged_totalfiles[k] = merged_totalfiles[k]
+                existing_pd = existing.get("percent_details", {})
+                for k in ("totalpercent", "totalpercenteng", "totalpercentjp", "currentpercent", "currentpercenteng", "currentpercentjp"):
+                    try:
+                        merged_pd[k] = float(existing_pd.get(k, merged_pd[k]) or merged_pd[k])
+                    except Exception:
+                        merged_pd[k] = merged_pd[k]
 
-            existing_pd = existing.get("percent_details", {})
-            for k in ("totalpercent", "totalpercenteng", "totalpercentjp", "currentpercent", "currentpercenteng", "currentpercentjp"):
-                try:
-                    merged_pd[k] = float(existing_pd.get(k, merged_pd[k]) or merged_pd[k])
-                except Exception:
-                    merged_pd[k] = merged_pd[k]
-
-        # Compute the current run's totalfiles fragment (we only set the language-specific totals here)
-        cur_totalfiles: Dict[str, int] = {}
-        dest_str = str(dest_root).lower()
-        # Best-effort detection: if dest_root looks like ENG or JP, fill that language's total
-        if lang == "ENG" or "db-eng" in dest_str:
-            cur_totalfiles["engtotal"] = total
-            cur_totalfiles["engmissing"] = planned_count
-        if lang == "JP" or "db-jp" in dest_str:
-            cur_totalfiles["jptotal"] = total
-            cur_totalfiles["jpmissing"] = planned_count
-        # If neither, try to be conservative: if mapping non-empty, guess via lang param only
-        if not cur_totalfiles and lang:
-            if lang.upper() == "ENG":
+            # Compute the current run's totalfiles fragment (we only set the language-specific totals here)
+            cur_totalfiles: Dict[str, int] = {}
+            dest_str = str(dest_root).lower()
+            # Best-effort detection: if dest_root looks like ENG or JP, fill that language's total
+            if lang == "ENG" or "db-eng" in dest_str:
                 cur_totalfiles["engtotal"] = total
                 cur_totalfiles["engmissing"] = planned_count
-            elif lang.upper() == "JP":
+            if lang == "JP" or "db-jp" in dest_str:
                 cur_totalfiles["jptotal"] = total
                 cur_totalfiles["jpmissing"] = planned_count
+            # If neither, try to be conservative: if mapping non-empty, guess via lang param only
+            if not cur_totalfiles and lang:
+                if lang.upper() == "ENG":
+                    cur_totalfiles["engtotal"] = total
+                    cur_totalfiles["engmissing"] = planned_count
+                elif lang.upper() == "JP":
+                    cur_totalfiles["jptotal"] = total
+                    cur_totalfiles["jpmissing"] = planned_count
+
+            # Prepare a language-scoped percent_details update for the "current" run overlay
+            pd_update = {
+                "currentpercent": 0.0,
+                "currentpercenteng": 0.0,
+                "currentpercentjp": 0.0
+            }
+
+            # Merge the runtime fragments with the merged structures so we write a complete status.json
+            merged_totalfiles.update(cur_totalfiles)
+            merged_pd.update(pd_update)
+
+            # If there are zero planned items for this run, ensure missing counts are zero (no-op run)
+            if planned_count == 0:
+                if "engmissing" in cur_totalfiles:
+                    merged_totalfiles["engmissing"] = 0
+                if "jpmissing" in cur_totalfiles:
+                    merged_totalfiles["jpmissing"] = 0
+
+            # Compute best-effort totalpercent values from merged_totalfiles so UI shows meaningful totals
+            try:
+                et = int(merged_totalfiles.get("engtotal", 0) or 0)
+                jt = int(merged_totalfiles.get("jptotal", 0) or 0)
+                em = int(merged_totalfiles.get("engmissing", 0) or 0)
+                jm = int(merged_totalfiles.get("jpmissing", 0) or 0)
+
+                eng_completed = max(0, et - em)
+                jp_completed = max(0, jt - jm)
+                overall_total = et + jt
+                already_present = eng_completed + jp_completed
+
+                if overall_total > 0:
+                    merged_pd["totalpercent"] = float((already_present / overall_total) * 100.0)
+                else:
+                    merged_pd["totalpercent"] = float(merged_pd.get("totalpercent", 0.0))
 
-        # Prepare a language-scoped percent_details update for the "current" run overlay
-        pd_update = {
-            "currentpercent": 0.0,
-            "currentpercenteng": 0.0,
-            "currentpercentjp": 0.0
-        }
-
-        # Merge the runtime fragments with the merged structures so we write a complete status.json
-        merged_totalfiles.update(cur_totalfiles)
-        merged_pd.update(pd_update)
-
-        # If there are zero planned items for this run, ensure missing counts are zero (no-op run)
-        if planned_count == 0:
-            if "engmissing" in cur_totalfiles:
-                merged_totalfiles["engmissing"] = 0
-            if "jpmissing" in cur_totalfiles:
-                merged_totalfiles["jpmissing"] = 0
-
-        # Compute best-effort totalpercent values from merged_totalfiles so UI shows meaningful totals
-        try:
-            et = int(merged_totalfiles.get("engtotal", 0) or 0)
-            jt = int(merged_totalfiles.get("jptotal", 0) or 0)
-            em = int(merged_totalfiles.get("engmissing", 0) or 0)
-            jm = int(merged_totalfiles.get("jpmissing", 0) or 0)
-
-            eng_completed = max(0, et - em)
-            jp_completed = max(0, jt - jm)
-            overall_total = et + jt
-            already_present = eng_completed + jp_completed
-
-            if overall_total > 0:
-                merged_pd["totalpercent"] = float((already_present / overall_total) * 100.0)
-            else:
-                merged_pd["totalpercent"] = float(merged_pd.get("totalpercent", 0.0))
+                merged_pd["totalpercenteng"] = float((eng_completed / et) * 100.0) if et > 0 else 0.0
+                merged_pd["totalpercentjp"] = float((jp_completed / jt) * 100.0) if jt > 0 else 0.0
+            except Exception:
+                # keep existing merged_pd values if computation fails
+                pass
 
-            merged_pd["totalpercenteng"] = float((eng_completed / et) * 100.0) if et > 0 else 0.0
-            merged_pd["totalpercentjp"] = float((jp_completed / jt) * 100.0) if jt > 0 else 0.0
+            # Write the stable, merged status file so the UI sees totals before downloads begin
+            write_status_file(totalfiles=merged_totalfiles, percent_details=merged_pd, last_log=f"Planned downloads: {planned_count}")
         except Exception:
-            # keep existing merged_pd values if computation fails
+            # best-effort: ignore failures to prepare status file
             pass
-
-        # Write the stable, merged status file so the UI sees totals before downloads begin
-        write_status_file(totalfiles=merged_totalfiles, percent_details=merged_pd, last_log=f"Planned downloads: {planned_count}")
-    except Exception:
-        # best-effort: ignore failures to prepare status file
-        pass
+    # language transition: put the planned totals on disk before the workers start queueing progress
+    flush_status()
 
     print_section(f"Planned downloads: {len(plan)} (others already present)")
     print_section(f"Downloading {len(plan)} images → {dest_root}")
     # perform the actual downloads (this will emit PROGRESS lines and update status.json per-worker)
-    execute_download_plan(plan, threads, delay, timeout)
+    execute_download_plan(plan, threads, delay, timeout, session)
 
     # After downloads finish for this pass, ensure we mark language completion appropriately.
     try:
@@ -737,30 +981,126 @@ def download_images_by_set(mapping: Dict[str, List[Tuple[str, str]]], dest_root:
     except Exception:
         # swallow to avoid failing the whole run
         pass
+    flush_status()
 
 
 # ---- orchestration helpers ----
-def fetch_repos() -> None:
-    """Clone ENG & JP repos into TEMP_DIR."""
-    print_section("Fetching repositories")
-    fresh_clone(ENG_REPO, ENG_TEMP)
-    fresh_clone(JP_REPO, JP_TEMP)
+def _count_absent_in(set_dir: str, fnames: List[str]) -> int:
+    """How many of fnames are not in set_dir, from one directory listing."""
+    try:
+        with os.scandir(set_dir) as it:
+            present = {e.name for e in it}
+    except FileNotFoundError:
+        return len(fnames)
+    except OSError:
+        # unreadable listing: fall back to probing each name
+        _lexists = os.path.lexists
+        return sum(1 for fn in fnames if not _lexists(os.path.join(set_dir, fn)))
+    return sum(1 for fn in fnames if fn not in present)
+
+def count_missing(dest_root: Path, mapping: Dict[str, List[Tuple[str, str, str]]], workers: int = 8) -> int:
+    """
+    Number of planned images not on disk yet. Each set directory is listed once and the
+    filenames are checked against that snapshot, instead of one stat per image; the
+    listings run on a thread pool (readdir releases the GIL).
+    """
+    root = str(dest_root)
+    jobs = [(os.path.join(root, set_key), [fname for _, _, fname in pairs]) for set_key, pairs in mapping.items()]
+    if len(jobs) <= 1:
+        return sum(_count_absent_in(d, fns) for d, fns in jobs)
+    with ThreadPoolExecutor(max_workers=min(workers, len(jobs))) as ex:
+        return sum(ex.map(lambda job: _count_absent_in(*job), jobs))
+
+def fetch_repo(session: requests.Session, repo_url: str, dest: Path) -> None:
+    """Fetch one DB folder into dest (tarball, falling back to a shallow clone)."""
+    try:
+        fetch_db_archive(session, repo_url, dest)
+    except (requests.RequestException, tarfile.TarError, OSError) as e:
+        print_result(f"Archive fetch failed for {repo_url} ({e}), cloning instead", YELL)
+        fresh_clone(repo_url, dest)
+
+def repo_head(dest: Path) -> Optional[str]:
+    """Identity of the DB fetched into dest: the clone's HEAD commit, else the archive ETag."""
+    if (dest / ".git").exists():
+        code, out, _ = run(["git", "-C", str(dest), "rev-parse", "HEAD"])
+        return (out.strip() or None) if code == 0 else None
+    try:
+        return (dest / ".etag").read_text(encoding="utf-8").strip() or None
+    except OSError:
+        return None
+
+def load_heads(heads_path: Optional[Path]) -> Dict[str, str]:
+    if heads_path is None:
+        return {}
+    try:
+        data = json.loads(heads_path.read_bytes())
+        return data if isinstance(data, dict) else {}
+    except (OSError, ValueError):
+        return {}
+
+def save_heads(heads_path: Optional[Path], heads: Dict[str, str]) -> None:
+    if heads_path is None:
+        return
+    try:
+        tmp = heads_path.with_name(heads_path.name + ".tmp")
+        tmp.write_text(json.dumps(heads, indent=2), encoding="utf-8")
+        os.replace(tmp, heads_path)
+    except OSError as e:
+        print_result(f"Could not record synced heads in {heads_path}: {e}", YELL)
+
+def fetch_and_sync(
+    session: requests.Session,
+    label: str,
+    repo_url: str,
+    temp_repo: Path,
+    dest_json_root: Path,
+    hash_workers: int,
+    net_slots: threading.Semaphore,
+    last_head: Optional[str] = None,
+) -> Tuple[int, int, int, Set[str], Set[str], Optional[str]]:
+    """
+    One language's pipeline stage: fetch (holding a network slot), then sync the JSON locally.
+    The sync is skipped when the fetched DB is the one last synced (same head as last_head).
+    Returns sync_db_folder's counts plus the head of the fetched DB.
+    """
+    with net_slots:
+        fetch_repo(session, repo_url, temp_repo)
+    head = repo_head(temp_repo)
+    if head and head == last_head and any(dest_json_root.glob("*.json")):
+        print_result(f"{label}: DB unchanged since the last sync ({head}), skipping JSON sync")
+        return 0, 0, 0, set(), set(), head
+    print_section(f"{label}: syncing JSON from {temp_repo/'DB'} → {dest_json_root}")
+    return (*sync_db_folder(temp_repo, dest_json_root, hash_workers), head)
 
 def translate_force_sets(force_stems: Set[str], stem_to_canon: Dict[str, str]) -> Set[str]:
-    out: Set[str] = set()
-    for s in force_stems:
-        out.add(stem_to_canon.get(s, s))
-    return out
-
-def sync_all_json(eng_json_root: Path, jp_json_root: Path) -> Tuple[Set[str], Set[str]]:
-    print_section(f"ENG: syncing JSON from {ENG_TEMP/'DB'} → {eng_json_root}")
-    eng_new, eng_upd, eng_same, eng_new_sets, eng_upd_sets = sync_db_folder(ENG_TEMP, eng_json_root)
-    print(f"\nENG sync summary: new={eng_new}, updated={eng_upd}, unchanged={eng_same}")
+    return {stem_to_canon.get(s, s) for s in force_stems}
 
-    print_section(f"JP: syncing JSON from {JP_TEMP/'DB'} → {jp_json_root}")
-    jp_new, jp_upd, jp_same, jp_new_sets, jp_upd_sets = sync_db_folder(JP_TEMP, jp_json_root)
+def sync_all_json(eng_json_root: Path, jp_json_root: Path, timeout: int, hash_workers: int = 1,
+                  heads_path: Optional[Path] = None, fetch_slots: int = 2) -> Tuple[Set[str], Set[str]]:
+    """
+    Fetch and sync ENG and JP as two concurrent stages. Both fetches are network-bound and
+    run side by side by default; fetch_slots=1 serializes them (for a thin uplink), in
+    which case JP's fetch still overlaps ENG's hash/copy pass.
+    heads_path records the DB head each language was last synced from; a language whose
+    fetched head still matches skips its sync (and forces no re-downloads).
+    """
+    heads = load_heads(heads_path)
+    with build_session(timeout) as session:
+        net_slots = threading.Semaphore(max(1, fetch_slots))
+        with ThreadPoolExecutor(max_workers=2) as ex:
+            eng_fut = ex.submit(fetch_and_sync, session, "ENG", ENG_REPO, ENG_TEMP, eng_json_root, hash_workers, net_slots, heads.get("ENG"))
+            jp_fut = ex.submit(fetch_and_sync, session, "JP", JP_REPO, JP_TEMP, jp_json_root, hash_workers, net_slots, heads.get("JP"))
+
+            eng_new, eng_upd, eng_same, eng_new_sets, eng_upd_sets, eng_head = eng_fut.result()
+            jp_new, jp_upd, jp_same, jp_new_sets, jp_upd_sets, jp_head = jp_fut.result()
+    # both stages are done: the summaries cannot interleave with their log lines any more
+    print(f"\nENG sync summary: new={eng_new}, updated={eng_upd}, unchanged={eng_same}")
     print(f"\nJP sync summary: new={jp_new}, updated={jp_upd}, unchanged={jp_same}")
 
+    new_heads = {label: head for label, head in (("ENG", eng_head), ("JP", jp_head)) if head}
+    if new_heads != heads:
+        save_heads(heads_path, new_heads)
+
     eng_force = eng_new_sets | eng_upd_sets
     jp_force  = jp_new_sets  | jp_upd_sets
     return eng_force, jp_force
@@ -768,9 +1108,9 @@ def sync_all_json(eng_json_root: Path, jp_json_root: Path) -> Tuple[Set[str], Se
 def harvest_and_download(
     eng_force_stems: Set[str],
     jp_force_stems: Set[str],
-    eng_json_root: Path,
+    eng_harvest: Harvest,
     eng_img_root: Path,
-    jp_json_root: Path,
+    jp_harvest: Harvest,
     jp_img_root: Path,
     threads: int,
     delay: float,
@@ -778,89 +1118,51 @@ def harvest_and_download(
     only: Optional[str] = None
 ) -> None:
     """
-    Harvest both ENG and JP pairs first in order to compute TOTALS for both languages.
-    Write an initial status.json with totalfiles and percent_details (best-effort)
-    so the UI can render correct baseline percentages before any download starts.
-    Then run ENG and/or JP downloads. When a language starts, we only update its
-    language-specific currentpercent/currentmissing fields — we do not clobber the other language.
+    Run ENG and/or JP downloads from the pairs main() harvested (one harvest per language
+    per run). The initial totals are written once by main(), so this does not recompute
+    them. When a language starts,
+    we only update its language-specific currentpercent/currentmissing fields — we do
+    not clobber the other language.
     """
 
-    # Harvest BOTH JSON roots unconditionally so we can present accurate totals
-    # to the UI even when the run is limited to one language (only == "ENG" / "JP").
-    log("Harvesting (ENG)")
-    eng_map, eng_s2c = harvest_pairs_by_set(eng_json_root)
-
-    log("Harvesting (JP)")
-    jp_map, jp_s2c = harvest_pairs_by_set(jp_json_root)
-
-    total_eng = sum(len(v) for v in eng_map.values())
-    total_jp = sum(len(v) for v in jp_map.values())
-
-    # determine how many are already present (best-effort)
-    def count_missing(dest_root: Path, mapping: Dict[str, List[Tuple[str, str]]]):
-        missing = 0
-        for set_key, pairs in mapping.items():
-            for sid, url in pairs:
-                fname = f"{sid}{ext_from_url(url)}"
-                out_path = dest_root / set_key / fname
-                if not out_path.exists():
-                    missing += 1
-        return missing
-
-    eng_missing = 0 if total_eng == 0 else count_missing(eng_img_root, eng_map)
-    jp_missing = 0 if total_jp == 0 else count_missing(jp_img_root, jp_map)
-
-    # write initial status.json containing totals for both languages
-    try:
-        merged_totalfiles = {"engtotal": total_eng, "jptotal": total_jp, "engmissing": eng_missing, "jpmissing": jp_missing}
-        # compute best-effort totalpercent as present / overall
-        overall_total = (total_eng or 0) + (total_jp or 0)
-        already_present = max(0, (total_eng - eng_missing)) + max(0, (total_jp - jp_missing))
-        totalpercent = float((already_present / overall_total) * 100.0) if overall_total else 0.0
-        pd = {
-            "totalpercent": totalpercent,
-            "totalpercenteng": (float(((total_eng - eng_missing) / total_eng) * 100.0) if total_eng else 0.0),
-            "totalpercentjp": (float(((total_jp - jp_missing) / total_jp) * 100.0) if total_jp else 0.0),
-            "currentpercent": 0.0,
-            "currentpercenteng": 0.0,
-            "currentpercentjp": 0.0
-        }
-        write_status_file(totalfiles=merged_totalfiles, percent_details=pd, last_log=f"Planned totals: ENG={total_eng} (missing {eng_missing}), JP={total_jp} (missing {jp_missing})")
-    except Exception:
-        pass
+    eng_map, eng_s2c, total_eng = eng_harvest
+    jp_map, jp_s2c, total_jp = jp_harvest
 
     # Now run the actual downloads (keep previous logic but use our harvested maps)
     # Only call per-language download when appropriate; harvesting already done above.
-    if only is None or only == "ENG":
-        print_section("ENG: beginning download pass")
-        eng_force_canon = translate_force_sets(eng_force_stems, eng_s2c)
-        total_eng_count = sum(len(v) for v in eng_map.values())
-        print(f"Found {total_eng_count} image entries in ENG JSON across {len(eng_map)} canonical sets")
-        download_images_by_set(eng_map, eng_img_root, eng_force_canon, threads, delay, timeout, lang="ENG")
-    else:
-        log("Skipping ENG (only=JP)")
-
-    if only is None or only == "JP":
-        print_section("JP: beginning download pass")
-        jp_force_canon = translate_force_sets(jp_force_stems, jp_s2c)
-        total_jp_count = sum(len(v) for v in jp_map.values())
-        print(f"Found {total_jp_count} image entries in JP JSON across {len(jp_map)} canonical sets")
-        download_images_by_set(jp_map, jp_img_root, jp_force_canon, threads, delay, timeout, lang="JP")
-    else:
-        log("Skipping JP (only=ENG)")
+    # Both passes share one session, so keep-alive connections (and their TLS handshakes)
+    # carry over from the ENG pass to the JP pass.
+    with build_session(timeout, pool_maxsize=max(1, threads) * 2) as session:
+        if only is None or only == "ENG":
+            print_section("ENG: beginning download pass")
+            eng_force_canon = translate_force_sets(eng_force_stems, eng_s2c)
+            print(f"Found {total_eng} image entries in ENG JSON across {len(eng_map)} canonical sets")
+            download_images_by_set(eng_map, eng_img_root, eng_force_canon, threads, delay, timeout, lang="ENG", total=total_eng, session=session)
+        else:
+            log("Skipping ENG (only=JP)")
+
+        if only is None or only == "JP":
+            print_section("JP: beginning download pass")
+            jp_force_canon = translate_force_sets(jp_force_stems, jp_s2c)
+            print(f"Found {total_jp} image entries in JP JSON across {len(jp_map)} canonical sets")
+            download_images_by_set(jp_map, jp_img_root, jp_force_canon, threads, delay, timeout, lang="JP", total=total_jp, session=session)
+        else:
+            log("Skipping JP (only=ENG)")
 
 # ---- CLI parsing ----
-def parse_args():
+def parse_args(argv: Optional[List[str]] = None):
     ap = argparse.ArgumentParser(description="Weiss Schwarz image downloader")
     ap.add_argument("--threads", type=int, default=DEFAULT_THREADS, help="Number of concurrent download threads")
     ap.add_argument("--delay",   type=float, default=DEFAULT_DELAY, help="Delay (seconds) between downloads per thread")
     ap.add_argument("--timeout", type=int, default=DEFAULT_TIMEOUT, help="HTTP timeout per request (seconds)")
     ap.add_argument("--only", choices=["ENG","JP"], default=None, help="Only run ENG or JP section")
     ap.add_argument("--out-dir", default=None, help="Output root for DB-ENG/DB-JP (overrides default locations)")
-    return ap.parse_args()
+    ap.add_argument("--hash-workers", type=int, default=min(8, os.cpu_count() or 1),
+                    help="Threads hashing JSON files during sync (use 1-2 on spinning disks)")
+    return ap.parse_args(argv)
 
-def main():
-    args = parse_args()
+def main(argv: Optional[List[str]] = None):
+    args = parse_args(argv)
 
     # resolve out-root priority:
     # 1) CLI --out-dir
@@ -894,9 +1196,9 @@ def main():
     only = args.only
 
     # fetch repos & sync JSON
-    fetch_repos()
-    print_section("Syncing JSON")
-    eng_force_stems, jp_force_stems = sync_all_json(eng_json_root, jp_json_root)
+    print_section("Fetching repositories and syncing JSON")
+    eng_force_stems, jp_force_stems = sync_all_json(eng_json_root, jp_json_root, args.timeout, args.hash_workers,
+                                                     heads_path=out_root / ".ws_heads.json")
     if eng_force_stems:
         print_result(f"ENG force re-download (stems): {', '.join(sorted(eng_force_stems))}", GREY)
     if jp_force_stems:
@@ -906,63 +1208,65 @@ def main():
     # Compute initial totals/missing for BOTH ENG and JP and write a single initial status.json.
     # This ensures the UI sees ENG + JP totals before any language-specific planner runs.
     # -----------------------
-    try:
-        eng_map_all, _ = harvest_pairs_by_set(eng_json_root)
-        jp_map_all, _ = harvest_pairs_by_set(jp_json_root)
-        total_eng_all = sum(len(v) for v in eng_map_all.values())
-        total_jp_all = sum(len(v) for v in jp_map_all.values())
+    # Harvest BOTH JSON roots once, even when the run is limited to one language: the totals
+    # below and the download passes share these results. The languages touch disjoint trees,
+    # so the two harvests (and then the two missing counts) run side by side.
+    with ThreadPoolExecutor(max_workers=2) as ex:
+        eng_harvest, jp_harvest = ex.map(harvest_pairs_by_set, (eng_json_root, jp_json_root))
+    _, _, total_eng_all = eng_harvest
+    _, _, total_jp_all = jp_harvest
+
+    if STATUS_UI:
+        try:
+            # missing = planned pairs whose target file does not exist: the same test the planner applies.
+            # Only the languages this run downloads are counted; a skipped language keeps the missing
+            # count from the previous status (0 if there is none), since its images are not touched.
+            prev_tf = read_status().get("totalfiles") or {}
 
-        def _count_existing_images(p: Path) -> int:
-            # best-effort count of image files under the Images folder
-            try:
-                if not p.exists():
+            def _prev_missing(key: str, total: int) -> int:
+                try:
+                    return min(total, max(0, int(prev_tf.get(key, 0) or 0)))
+                except (TypeError, ValueError):
                     return 0
-                cnt = 0
-                for f in p.rglob("*"):
-                    if f.is_file():
-                        suf = f.suffix.lower()
-                        if suf in (".png", ".jpg", ".jpeg"):
-                            cnt += 1
-                return cnt
-            except Exception:
-                return 0
-
-        eng_existing = _count_existing_images(eng_img_root)
-        jp_existing = _count_existing_images(jp_img_root)
-
-        eng_missing_initial = max(0, total_eng_all - eng_existing)
-        jp_missing_initial = max(0, total_jp_all - jp_existing)
-
-        overall_total_initial = (total_eng_all or 0) + (total_jp_all or 0)
-        eng_completed_initial = max(0, total_eng_all - eng_missing_initial)
-        jp_completed_initial = max(0, total_jp_all - jp_missing_initial)
-
-        tf_initial = {
-            "engtotal": int(total_eng_all),
-            "jptotal": int(total_jp_all),
-            "engmissing": int(eng_missing_initial),
-            "jpmissing": int(jp_missing_initial),
-        }
-
-        pd_initial = {
-            "currentpercent": 0.0,
-            "currentpercenteng": 0.0,
-            "currentpercentjp": 0.0,
-            "totalpercenteng": float((eng_completed_initial / total_eng_all) * 100.0) if total_eng_all > 0 else 0.0,
-            "totalpercentjp": float((jp_completed_initial / total_jp_all) * 100.0) if total_jp_all > 0 else 0.0,
-        }
-        pd_initial["totalpercent"] = float(((eng_completed_initial + jp_completed_initial) / overall_total_initial) * 100.0) if overall_total_initial > 0 else 0.0
-
-        write_status_file(totalfiles=tf_initial, percent_details=pd_initial, last_log=f"Planned totals: ENG={total_eng_all} (missing {eng_missing_initial}), JP={total_jp_all} (missing {jp_missing_initial})")
-    except Exception:
-        # best-effort: don't crash the run
-        pass
+
+            with ThreadPoolExecutor(max_workers=2) as ex:
+                eng_counted = ex.submit(count_missing, eng_img_root, eng_harvest[0]) if total_eng_all and only != "JP" else None
+                jp_counted = ex.submit(count_missing, jp_img_root, jp_harvest[0]) if total_jp_all and only != "ENG" else None
+                eng_missing_initial = eng_counted.result() if eng_counted else (_prev_missing("engmissing", total_eng_all) if only == "JP" else 0)
+                jp_missing_initial = jp_counted.result() if jp_counted else (_prev_missing("jpmissing", total_jp_all) if only == "ENG" else 0)
+
+            overall_total_initial = (total_eng_all or 0) + (total_jp_all or 0)
+            eng_completed_initial = max(0, total_eng_all - eng_missing_initial)
+            jp_completed_initial = max(0, total_jp_all - jp_missing_initial)
+
+            tf_initial = {
+                "engtotal": int(total_eng_all),
+                "jptotal": int(total_jp_all),
+                "engmissing": int(eng_missing_initial),
+                "jpmissing": int(jp_missing_initial),
+            }
+
+            pd_initial = {
+                "currentpercent": 0.0,
+                "currentpercenteng": 0.0,
+                "currentpercentjp": 0.0,
+                "totalpercenteng": float((eng_completed_initial / total_eng_all) * 100.0) if total_eng_all > 0 else 0.0,
+                "totalpercentjp": float((jp_completed_initial / total_jp_all) * 100.0) if total_jp_all > 0 else 0.0,
+            }
+            pd_initial["totalpercent"] = float(((eng_completed_initial + jp_completed_initial) / overall_total_initial) * 100.0) if overall_total_initial > 0 else 0.0
+
+            write_status_file(totalfiles=tf_initial, percent_details=pd_initial, last_log=f"Planned totals: ENG={total_eng_all} (missing {eng_missing_initial}), JP={total_jp_all} (missing {jp_missing_initial})")
+        except Exception:
+            # best-effort: don't crash the run
+            pass
+    # one write for the whole setup phase; everything before this only queued updates
+    flush_status()
 
     # run harvesting and downloads
     harvest_and_download(
         eng_force_stems, jp_force_stems,
-        eng_json_root, eng_img_root,
-        jp_json_root, jp_img_root,
+        eng_harvest, eng_img_root,
+        jp_harvest, jp_img_root,
         args.threads, args.delay, args.timeout, only
     )
     # --- auto-manifest trigger ---
@@ -971,7 +1275,6 @@ def main():
 
     print("\nAll done.")
     report_progress(100)
-    print("PROGRESS: 100")
 
 if __name__ == "__main__":
     main()
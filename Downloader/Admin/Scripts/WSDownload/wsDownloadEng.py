@@ -1,27 +1,20 @@
 #!/usr/bin/env python3
-# wrapper: run wsdownload.py with only ENG
-import os, sys
-from subprocess import Popen
+# wrapper: run wsDownload.main() in-process with only ENG
+import importlib, os, sys
 
 # this file is located at Scripts/WSDownload/
-here = os.path.dirname(__file__)                   # .../Scripts/WSDownload
-scripts_root = os.path.abspath(os.path.join(here)) # same directory
-script = os.path.join(scripts_root, "wsDownload.py")
+here = os.path.dirname(os.path.abspath(__file__))  # .../Scripts/WSDownload
+if here not in sys.path:
+    sys.path.insert(0, here)
 
-# If script absent, try different capitalizations
-if not os.path.exists(script):
-    # fallback attempts inside WSDownload folder
-    alt1 = os.path.join(scripts_root, "wsdownload.py")
-    alt2 = os.path.join(scripts_root, "WsDownload.py")
-    for alt in (alt1, alt2):
-        if os.path.exists(alt):
-            script = alt
-            break
-    else:
-        print("ERROR: wsDownload.py not found in Scripts/WSDownload - looked at:", script)
-        sys.exit(2)
+# try different capitalizations of the module name
+for name in ("wsDownload", "wsdownload", "WsDownload"):
+    if os.path.exists(os.path.join(here, name + ".py")):
+        ws = importlib.import_module(name)
+        break
+else:
+    print("ERROR: wsDownload.py not found in Scripts/WSDownload - looked at:", os.path.join(here, "wsDownload.py"))
+    sys.exit(2)
 
-args = [sys.executable, script, "--only", "ENG"] + sys.argv[1:]
-proc = Popen(args, cwd=scripts_root, env=os.environ)
-proc.wait()
-sys.exit(proc.returncode)
+if __name__ == "__main__":
+    ws.main(["--only", "ENG"] + sys.argv[1:])
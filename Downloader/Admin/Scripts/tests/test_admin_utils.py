@@ -0,0 +1,41 @@
+import json
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import textwrap
+import unittest
+
+WSDOWNLOAD = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WSDownload")
+
+
+@unittest.skipIf(os.name != "posix", "SIGTERM delivery is POSIX-only")
+class SigtermFlushTest(unittest.TestCase):
+    def test_queued_status_is_written_on_sigterm(self):
+        with tempfile.TemporaryDirectory() as d:
+            status = os.path.join(d, "status.json")
+            child = textwrap.dedent(f"""
+                import sys, time
+                sys.path.insert(0, {WSDOWNLOAD!r})
+                import adminUtils as a
+                a._STATUS_PATHS = ({status!r}, {status + ".tmp"!r})
+                a._STATUS_INTERVAL = 60  # the writer thread must not get there first
+                a.write_status_file(last_log="queued before cancel", state="running")
+                print("ready", flush=True)
+                time.sleep(60)
+            """)
+            proc = subprocess.Popen([sys.executable, "-c", child], stdout=subprocess.PIPE, text=True)
+            self.assertEqual(proc.stdout.readline().strip(), "ready")
+            proc.send_signal(signal.SIGTERM)
+            proc.wait(timeout=10)
+            proc.stdout.close()
+            self.assertEqual(proc.returncode, -signal.SIGTERM)
+            with open(status, encoding="utf-8") as f:
+                data = json.load(f)
+            self.assertEqual(data.get("state"), "running")
+            self.assertIn("queued before cancel", json.dumps(data))
+
+
+if __name__ == "__main__":
+    unittest.main()
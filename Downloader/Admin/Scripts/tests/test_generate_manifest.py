@@ -0,0 +1,120 @@
+import json
+import os
+import sys
+import tempfile
+import unittest
+from pathlib import Path
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "Manifest"))
+
+import generateManifest as gm  # noqa: E402
+
+
+def baseline_first(path):
+    # what safe_load_first returned before the streaming paths: full parse, first record
+    with open(path, "rb") as f:
+        return gm._first_from_data(json.load(f))
+
+
+def picked_name(sample):
+    # the only thing make_set_entry reads from a sample
+    if isinstance(sample, dict):
+        return next((sample[k] for k in gm.NAME_KEYS if sample.get(k)), None)
+    return None
+
+
+class SafeLoadFirstTest(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmp.cleanup)
+
+    def write(self, name, obj_or_text):
+        path = os.path.join(self.tmp.name, name)
+        text = obj_or_text if isinstance(obj_or_text, str) else json.dumps(obj_or_text)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+        return path
+
+    def load(self, path):
+        return gm.safe_load_first(path, os.path.basename(path))
+
+    def test_small_files_match_full_parse(self):
+        cases = {
+            "list.json": [{"name": "A", "code": "AB/W01-001"}, {"name": "B"}],
+            "keyed.json": {"cards": [{"expansion": "X", "series": "S"}], "other": [1]},
+            "mapval.json": {"set": {"set_name": "Direct"}},
+            "empty.json": [],
+            "scalar.json": {"version": 3},
+        }
+        for name, obj in cases.items():
+            path = self.write(name, obj)
+            self.assertEqual(picked_name(self.load(path)), picked_name(baseline_first(path)), name)
+
+    def test_large_keyed_file_streams_only_first_record(self):
+        # first record straddles the head, so the ijson branch takes over
+        big = "x" * (gm.SAMPLE_BYTES + 1024)
+        obj = {"cards": [{"blob": big, "name": "First"}] + [{"name": f"n{i}"} for i in range(2000)]}
+        path = self.write("big.json", obj)
+        self.assertEqual(self.load(path), baseline_first(path))
+
+    @unittest.skipIf(gm.ijson is None, "ijson not installed")
+    def test_keyed_stream_stops_after_first_record(self):
+        path = self.write("keyed.json", {"cards": [{"name": "First"}, {"name": "Second"}]})
+        with open(path, "rb") as f:
+            events = gm.ijson.parse(f)
+            self.assertEqual(gm._stream_first_record(events), {"name": "First"})
+            # the second record has not been consumed
+            self.assertEqual(next(events)[1:], ("start_map", None))
+
+    def test_large_keyed_file_with_map_value(self):
+        big = "y" * (gm.SAMPLE_BYTES + 1024)
+        obj = {"set": {"blob": big, "set_name": "Mapped"}, "rest": [1, 2, 3]}
+        path = self.write("bigmap.json", obj)
+        self.assertEqual(self.load(path), baseline_first(path))
+
+
+class ScanNameFieldsTest(unittest.TestCase):
+    def scan(self, text):
+        buf = text.encode("utf-8")
+        start = buf.index(b"{")
+        end = gm._object_end(buf, start, len(buf))
+        return gm._scan_name_fields(buf, start, end)
+
+    def test_plain_record(self):
+        self.assertEqual(self.scan('{"name": "a", "code": "AB/W01-001"}'), {"name": "a"})
+
+    def test_container_name_falls_back_to_full_parse(self):
+        self.assertIsNone(self.scan('{"name": {"en": "a"}, "set_name": "b"}'))
+        self.assertIsNone(self.scan('{"expansion": ["a"], "series": "b"}'))
+
+    def test_trailing_comma_is_rejected(self):
+        self.assertIsNone(self.scan('{"name": "a",}'))
+        self.assertIsNone(self.scan('{"name": "a", }'))
+
+    def test_trailing_comma_file_uses_stem_key(self):
+        with tempfile.TemporaryDirectory() as d:
+            path = os.path.join(d, "BAD.json")
+            with open(path, "w", encoding="utf-8") as f:
+                f.write('[{"name":"a",}]')
+            entry = gm.make_set_entry(("BAD.json", "BAD", path), "EN")
+        self.assertEqual(entry["name"], "BAD")
+
+
+
+class MirrorFileTest(unittest.TestCase):
+    def test_mirror_is_an_independent_copy(self):
+        with tempfile.TemporaryDirectory() as d:
+            src = Path(d) / "manifest-eng.json"
+            dst = Path(d) / "DB-ENG" / "sets-manifest.json"
+            src.write_bytes(b'[{"key": "A"}]')
+            gm.mirror_file(src, dst)
+            self.assertEqual(dst.read_bytes(), src.read_bytes())
+            self.assertNotEqual(os.stat(src).st_ino, os.stat(dst).st_ino)
+            # an in-place write to the mirror must not reach the original
+            with open(dst, "r+b") as f:
+                f.write(b"XX")
+            self.assertEqual(src.read_bytes(), b'[{"key": "A"}]')
+
+
+if __name__ == "__main__":
+    unittest.main()
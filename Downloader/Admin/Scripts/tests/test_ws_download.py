@@ -0,0 +1,93 @@
+import json
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "WSDownload"))
+
+import wsDownload as ws  # noqa: E402
+
+
+class ExtFromUrlTest(unittest.TestCase):
+    def test_plain_extensions(self):
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/bd/W63_001.png"), ".png")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/bd/W63_001.jpg"), ".jpg")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/bd/W63_001.JPEG"), ".jpeg")
+
+    def test_dotless_path_defaults_to_png(self):
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/jpg"), ".png")
+        self.assertEqual(ws.ext_from_url("jpg"), ".png")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001"), ".png")
+
+    def test_query_and_fragment_are_ignored(self):
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001.jpg?v=2"), ".jpg")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001.jpeg#top"), ".jpeg")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001.png?f=a.jpg"), ".png")
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001?f=a.jpg"), ".png")
+
+    def test_unknown_extension_defaults_to_png(self):
+        self.assertEqual(ws.ext_from_url("https://ws-tcg.com/cardimages/W63_001.gif"), ".png")
+        self.assertEqual(ws.ext_from_url("https://host.jpg"), ".png")
+
+
+
+def walk_first_code(node):
+    # the tree walk canonical_set_key_from_json_first_code used to do over the parsed file
+    if isinstance(node, dict):
+        for k in ("code", "CardCode", "cardCode", "id", "ID", "number", "Number"):
+            v = node.get(k)
+            if isinstance(v, str):
+                m = ws.CODE_RE.search(v)
+                if m:
+                    return f"{m.group(1).upper()}_{m.group(2).upper()}"
+        for v in node.values():
+            got = walk_first_code(v)
+            if got:
+                return got
+    elif isinstance(node, list):
+        for v in node:
+            got = walk_first_code(v)
+            if got:
+                return got
+    elif isinstance(node, str):
+        m = ws.CODE_RE.search(node)
+        if m:
+            return f"{m.group(1).upper()}_{m.group(2).upper()}"
+    return None
+
+
+def card(n, **extra):
+    # field order of the DB set files: name and text come before the code
+    rec = {"name": f"Card {n}", "code": f"BD/W63-{n:03d}", "rarity": "C",
+           "image": f"https://ws-tcg.com/wp/wp-content/images/cardimages/bd/W63_{n:03d}.png"}
+    rec.update(extra)
+    return rec
+
+
+class CanonicalSetKeyTest(unittest.TestCase):
+    def check(self, data, text=None):
+        raw = (text if text is not None else json.dumps(data)).encode("utf-8")
+        expected = walk_first_code(data) or "stem"
+        self.assertEqual(ws.canonical_set_key_from_json_first_code(raw, "stem"), expected)
+        return expected
+
+    def test_set_file_shapes(self):
+        self.assertEqual(self.check([card(1), card(2)]), "BD_W63")
+        self.check({"BD/W63-001": card(1), "BD/W63-002": card(2)})
+        self.check({"cards": [card(1), card(2)]})
+
+    def test_code_shaped_name_does_not_win(self):
+        data = [{"name": "Reprint of PD/S22-001", "ability": "see SY/W08-010", "code": "BD/W63-001"}]
+        self.assertEqual(self.check(data), "BD_W63")
+        self.assertEqual(self.check([card(1, name="Fan art (KS/W49-001)")]), "BD_W63")
+
+    def test_escaped_slash_in_code(self):
+        self.assertEqual(self.check([card(1)], text='[{"name": "x", "code": "BD\\/W63-001"}]'), "BD_W63")
+
+    def test_no_code_key_falls_back_to_any_string(self):
+        self.assertEqual(self.check([{"name": "x", "text": "BD/W63-001"}]), "BD_W63")
+        self.assertEqual(self.check([{"name": "x"}]), "stem")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -160,7 +160,8 @@ app.post("/api/download", (req, res) => {
     if (outDir) spawnArgs.push("--out-dir", outDir);
 
     // ensure PYTHONUNBUFFERED=1 in env as extra guarantee
-    const childEnv = { ...process.env, PYTHONUNBUFFERED: "1", OUT_DIR: outDir || process.env.OUT_DIR || "" };
+    // WS_STATUS_UI=1: this run feeds the UI, so the scripts keep status.json totals up to date
+    const childEnv = { ...process.env, PYTHONUNBUFFERED: "1", WS_STATUS_UI: "1", OUT_DIR: outDir || process.env.OUT_DIR || "" };
 
     const child = spawn(PYTHON, spawnArgs, {
       cwd: SCRIPTS_DIR,